@@ -0,0 +1,151 @@
+import argparse
+import json
+import shutil
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.mirror import start_mirror
+from benchmarks.report import environment, write_report
+from benchmarks.synthetic import CADASTRO_DIR, DEMONSTRACOES_DIR, generate, quarter_list
+from src.etl.cadastro import CadastroProvider
+from src.etl.downloader import ANSDownloader
+from src.etl.processor import ANSProcessor
+from src.etl.profiling import RunProfiler
+
+
+def run_pipeline(base_url: str, workdir: Path, workers: int, load: bool, load_mode: str) -> dict:
+    profiler = RunProfiler()
+    stage = profiler.stage
+    started = time.perf_counter()
+
+    downloader = ANSDownloader(download_dir=str(workdir / "downloads"), base_url=base_url + DEMONSTRACOES_DIR)
+    cadastro = CadastroProvider(cache_dir=str(workdir / "downloads"), base_url=base_url + CADASTRO_DIR)
+    processor = ANSProcessor(output_dir=str(workdir / "processed"), cadastro=cadastro)
+
+    with stage("listagem"):
+        quarters = downloader.get_available_quarters()
+
+    with stage("download") as stats:
+        zip_files = downloader.download_quarters(quarters)
+        stats.extra["zip_bytes"] = sum(path.stat().st_size for path in zip_files)
+
+    partitions = []
+    for zip_file in zip_files:
+        with stage("leitura") as stats:
+            data_files = processor.find_despesas_files(downloader.list_zip_members(zip_file))
+            data = processor.process_files(data_files, workers=workers)
+            stats.add_rows(rows_out=len(data))
+        with stage("agregacao_trimestre") as stats:
+            partition = processor.aggregate_despesas(data)
+            stats.add_rows(rows_in=len(data), rows_out=len(partition))
+        partitions.append(partition)
+        del data
+
+    with stage("consolidacao") as stats:
+        df_consolidated = processor.consolidate_data(partitions=partitions)
+        stats.add_rows(rows_in=sum(len(partition) for partition in partitions), rows_out=len(df_consolidated))
+
+    with stage("cadastro") as stats:
+        processor.download_operadoras_cadastro()
+        stats.add_rows(rows_out=len(processor.cadastro.operadoras()))
+
+    with stage("enriquecimento") as stats:
+        df_enriched = processor.enrich_data(df_consolidated)
+        stats.add_rows(rows_in=len(df_consolidated), rows_out=len(df_enriched))
+
+    with stage("agregacao") as stats:
+        df_aggregated = processor.aggregate_data(df_enriched)
+        stats.add_rows(rows_in=len(df_enriched), rows_out=len(df_aggregated))
+
+    if load:
+        from src.etl.loader import PostgresLoader
+
+        with stage("carga") as stats:
+            loader = PostgresLoader()
+            frames = loader.prepare_frames(processor.cadastro.operadoras(), df_consolidated, df_aggregated)
+            loader.load(frames, mode=load_mode)
+            stats.add_rows(rows_in=sum(len(frame) for frame in frames.values()))
+
+    return {
+        "stages": profiler.report()["stages"],
+        "total_seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def ensure_dataset(root: Path, params: dict, reuse: bool) -> dict:
+    summary_path = root / "summary.json"
+    if reuse and summary_path.exists():
+        summary = json.loads(summary_path.read_text(encoding="utf-8"))
+        if summary.get("params") == params:
+            print(f"Reutilizando dados sintéticos de {root}", file=sys.stderr)
+            return summary
+
+    shutil.rmtree(root, ignore_errors=True)
+    end_year, end_quarter = (int(part) for part in params["end"].split("-"))
+    summary = generate(
+        root,
+        params["rows"],
+        quarter_list(end_year, end_quarter, params["quarters"]),
+        params["operadoras"],
+        seed=params["seed"],
+    )
+    summary["params"] = params
+    summary_path.write_text(json.dumps(summary, indent=2, ensure_ascii=False), encoding="utf-8")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede cada etapa do ETL sobre dados sintéticos servidos por um espelho HTTP local")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Linhas por trimestre")
+    parser.add_argument("--quarters", type=int, default=3)
+    parser.add_argument("--end", default="2025-3", help="Último trimestre, no formato ANO-TRIMESTRE")
+    parser.add_argument("--operadoras", type=int, default=1_500)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", default="data/benchmark")
+    parser.add_argument("--reuse", action="store_true", help="Reaproveita os dados gerados se os parâmetros forem os mesmos")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--load", action="store_true", help="Inclui a carga no PostgreSQL (DATABASE_URL); deixa o banco semeado para o teste de carga da API")
+    parser.add_argument("--load-mode", choices=["replace", "upsert"], default="replace")
+    parser.add_argument("--output", help="Arquivo JSON com o resultado")
+    args = parser.parse_args()
+
+    data_dir = Path(args.data_dir)
+    params = {
+        "rows": args.rows,
+        "quarters": args.quarters,
+        "end": args.end,
+        "operadoras": args.operadoras,
+        "seed": args.seed,
+    }
+    dataset = ensure_dataset(data_dir / "mirror", params, args.reuse)
+
+    server, base_url = start_mirror(data_dir / "mirror")
+    runs = []
+    try:
+        for _ in range(args.repeat):
+            workdir = data_dir / "run"
+            shutil.rmtree(workdir, ignore_errors=True)
+            runs.append(run_pipeline(base_url, workdir, args.workers, args.load, args.load_mode))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    write_report({
+        "benchmark": "etl",
+        "environment": environment(),
+        "params": {**params, "workers": args.workers, "load": args.load, "load_mode": args.load_mode},
+        "dataset": {
+            "generation_seconds": dataset["seconds"],
+            "zip_bytes": sum(item["bytes"] for item in dataset["quarters"]),
+        },
+        "runs": runs,
+        "best_total_seconds": min(run["total_seconds"] for run in runs),
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.report import environment, write_report
+
+ROUTES = {
+    "estatisticas": ("GET", "/api/estatisticas"),
+    "operadoras_pagina": ("GET", "/api/operadoras?page={page}&limit=20"),
+    "operadoras_busca": ("GET", "/api/operadoras?search={term}&limit=10"),
+    "operadoras_uf": ("GET", "/api/operadoras?uf={uf}&page={page}&limit=10"),
+    "operadoras_cursor": ("GET", "/api/operadoras?cursor=&limit=20"),
+    "operadora_detalhe": ("GET", "/api/operadoras/{cnpj}"),
+    "operadora_despesas": ("GET", "/api/operadoras/{cnpj}/despesas?limit=10"),
+    "operadoras_batch": ("POST", "/api/operadoras/batch"),
+    "analytics_crescimento": ("GET", "/api/analytics/crescimento?limit=10"),
+    "analytics_distribuicao_uf": ("GET", "/api/analytics/distribuicao-uf?limit=10"),
+    "analytics_acima_media": ("GET", "/api/analytics/acima-media?limit=10"),
+    "export_operadoras": ("GET", "/api/export/operadoras?formato=ndjson&uf={uf}"),
+    "export_despesas": ("GET", "/api/export/despesas?cnpj={cnpj}"),
+}
+MIXED_ROUTES = [
+    "estatisticas",
+    "operadoras_pagina",
+    "operadoras_busca",
+    "operadoras_uf",
+    "operadora_detalhe",
+    "operadora_despesas",
+]
+BATCH_SIZE = 100
+UFS = ["SP", "RJ", "MG", "PR", "RS", "SC", "BA", "GO", "PE", "CE"]
+TERMS = ["saude", "unimed", "medica", "odonto", "assistencia", "plano", "sao", "coop"]
+
+
+def percentile(samples, fraction: float) -> float:
+    if not samples:
+        return 0.0
+    index = min(int(len(samples) * fraction), len(samples) - 1)
+    return samples[index]
+
+
+async def discover_cnpjs(client: httpx.AsyncClient):
+    response = await client.get("/api/operadoras", params={"limit": 100})
+    response.raise_for_status()
+    return [item["cnpj"] for item in response.json()["data"]] or ["00000000000000"]
+
+
+async def worker(client: httpx.AsyncClient, routes, cnpjs, deadline: float, rng: random.Random, latencies, errors):
+    while time.perf_counter() < deadline:
+        method, path = ROUTES[rng.choice(routes)]
+        path = path.format(
+            page=rng.randint(1, 5),
+            term=rng.choice(TERMS),
+            uf=rng.choice(UFS),
+            cnpj=rng.choice(cnpjs),
+        )
+        body = {"cnpjs": rng.sample(cnpjs, min(BATCH_SIZE, len(cnpjs)))} if method == "POST" else None
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, path, json=body)
+            if response.status_code >= 500:
+                errors.append(response.status_code)
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+async def run(base_url: str, routes, concurrency: int, duration: float, warmup: float, seed: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        cnpjs = await discover_cnpjs(client)
+        if warmup:
+            await asyncio.gather(*[
+                worker(client, routes, cnpjs, time.perf_counter() + warmup, random.Random(seed + i), [], [])
+                for i in range(concurrency)
+            ])
+
+        latencies, errors = [], []
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*[
+            worker(client, routes, cnpjs, deadline, random.Random(seed + i), latencies, errors)
+            for i in range(concurrency)
+        ])
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 2),
+        "requests": len(latencies),
+        "errors": len(errors),
+        "req_per_s": round(len(latencies) / elapsed, 1),
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies), 2) if latencies else 0.0,
+            "p50": round(percentile(latencies, 0.50), 2),
+            "p90": round(percentile(latencies, 0.90), 2),
+            "p99": round(percentile(latencies, 0.99), 2),
+            "max": round(latencies[-1], 2) if latencies else 0.0,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga das rotas da API, rota a rota e com tráfego misto")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--duration", type=float, default=15, help="Segundos por rota e por concorrência")
+    parser.add_argument("--warmup", type=float, default=2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--routes", nargs="+", choices=[*ROUTES, "mixed"], default=["mixed"], help="Rotas medidas isoladamente; 'mixed' sorteia entre as rotas de leitura mais comuns")
+    parser.add_argument("--all-routes", action="store_true", help="Mede todas as rotas, uma de cada vez, além do tráfego misto")
+    parser.add_argument("--output", help="Arquivo JSON com o resultado")
+    args = parser.parse_args()
+
+    selected = [*ROUTES, "mixed"] if args.all_routes else args.routes
+    results = {}
+    for name in selected:
+        routes = MIXED_ROUTES if name == "mixed" else [name]
+        results[name] = [
+            asyncio.run(run(args.base_url, routes, concurrency, args.duration, args.warmup, args.seed))
+            for concurrency in args.concurrency
+        ]
+        print(f"{name}: " + ", ".join(
+            f"c={item['concurrency']} {item['req_per_s']} req/s p50={item['latency_ms']['p50']}ms p99={item['latency_ms']['p99']}ms"
+            for item in results[name]
+        ), file=sys.stderr)
+
+    write_report({
+        "benchmark": "api",
+        "environment": environment(),
+        "base_url": args.base_url,
+        "duration_s": args.duration,
+        "routes": results,
+    }, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import argparse
+import functools
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Tuple
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def create_mirror(root: Path, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    handler = functools.partial(QuietHandler, directory=str(root))
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def mirror_url(server: ThreadingHTTPServer) -> str:
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}/"
+
+
+def start_mirror(root: Path, host: str = "127.0.0.1", port: int = 0) -> Tuple[ThreadingHTTPServer, str]:
+    server = create_mirror(root, host, port)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, mirror_url(server)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Espelho HTTP local dos dados abertos da ANS (listagens de diretório como o FTP/PDA)")
+    parser.add_argument("root", help="Diretório gerado por benchmarks/synthetic.py")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    server = create_mirror(Path(args.root), args.host, args.port)
+    print(f"Servindo {args.root} em {mirror_url(server)}")
+    print(f"Aponte o ETL para o espelho com ANS_BASE_URL={mirror_url(server)}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import func, or_, select
+
+from src.api.search import NGramIndex, get_operadora_search, normalize_text
+from src.core.database import AsyncSessionLocal
+from src.models.operadora import OperadoraCadastro
+
+WORDS = [
+    "SAÚDE", "ASSISTÊNCIA", "MÉDICA", "ODONTOLÓGICA", "COOPERATIVA", "TRABALHO",
+    "UNIMED", "PLANO", "HOSPITALAR", "SERVIÇOS", "ADMINISTRADORA", "BENEFÍCIOS",
+    "SÃO", "PAULO", "PARANÁ", "GOIÁS", "CLÍNICA", "AMIL", "BRADESCO", "SEGUROS",
+]
+SYLLABLES = ["ba", "ca", "da", "fe", "gu", "li", "ma", "no", "pe", "ra", "si", "to", "vi", "xa", "zu", "ção", "lân", "rei"]
+
+
+def synthetic_name(rng: random.Random, row_id: int) -> str:
+    words = [rng.choice(WORDS) for _ in range(rng.randint(1, 3))]
+    words += ["".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).upper() for _ in range(rng.randint(1, 2))]
+    rng.shuffle(words)
+    return " ".join(words) + f" {row_id}"
+
+
+def summarize(samples) -> dict:
+    samples.sort()
+    return {
+        "p50_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1], 3),
+        "max_ms": round(samples[-1], 3),
+    }
+
+
+def timed(fn, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+
+async def timed_async(fn, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+
+def search_terms(names, cnpjs, count: int, seed: int):
+    rng = random.Random(seed)
+    terms = []
+    for _ in range(count):
+        name = rng.choice(names)
+        kind = rng.randrange(4)
+        if kind == 0:
+            start = rng.randrange(max(len(name) - 5, 1))
+            terms.append(name[start:start + 5])
+        elif kind == 1:
+            terms.append(normalize_text(name.split()[0]))
+        elif kind == 2 and len(name) > 6:
+            position = rng.randrange(1, len(name) - 1)
+            terms.append(name[:position] + name[position + 1:])
+        else:
+            terms.append(rng.choice(cnpjs)[:6])
+    return terms
+
+
+def ilike_filter(term: str):
+    pattern = f"%{term}%"
+    return or_(OperadoraCadastro.razao_social.ilike(pattern), OperadoraCadastro.cnpj.like(pattern))
+
+
+async def benchmark_database(terms_count: int, repeat: int, seed: int) -> Optional[dict]:
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(select(OperadoraCadastro.razao_social, OperadoraCadastro.cnpj))).all()
+        if not rows:
+            return None
+        terms = search_terms([r.razao_social for r in rows], [r.cnpj for r in rows], terms_count, seed)
+        search = get_operadora_search()
+        backend = await search.warm(db)
+
+        async def count(stmt) -> int:
+            return (await db.execute(select(func.count()).select_from(stmt.subquery()))).scalar()
+
+        async def ilike():
+            for term in terms:
+                stmt = select(OperadoraCadastro).where(ilike_filter(term))
+                (await db.execute(stmt.order_by(OperadoraCadastro.razao_social).limit(10))).scalars().all()
+
+        async def indexed():
+            for term in terms:
+                stmt, ranking = await search.apply(db, select(OperadoraCadastro), term)
+                (await db.execute(stmt.order_by(*ranking, OperadoraCadastro.razao_social).limit(10))).scalars().all()
+
+        hits_ilike = 0
+        hits_search = 0
+        for term in terms:
+            hits_ilike += await count(select(OperadoraCadastro).where(ilike_filter(term))) > 0
+            stmt, _ = await search.apply(db, select(OperadoraCadastro), term)
+            hits_search += await count(stmt) > 0
+        return {
+            "backend": backend,
+            "terms": len(terms),
+            "ilike": {**(await timed_async(ilike, repeat)), "terms_with_hits": hits_ilike},
+            "search": {**(await timed_async(indexed, repeat)), "terms_with_hits": hits_search},
+        }
+
+
+def benchmark_synthetic(size: int, terms_count: int, repeat: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    rows = [
+        (
+            row_id,
+            synthetic_name(rng, row_id),
+            f"{rng.randrange(10 ** 14):014d}",
+        )
+        for row_id in range(1, size + 1)
+    ]
+    names = [name for _, name, _ in rows]
+    cnpjs = [cnpj for _, _, cnpj in rows]
+    terms = search_terms(names, cnpjs, terms_count, seed)
+
+    start = time.perf_counter()
+    index = NGramIndex(rows)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    lowered = [(row_id, name.lower(), cnpj) for row_id, name, cnpj in rows]
+
+    def scan():
+        for term in terms:
+            needle = term.lower()
+            [row_id for row_id, name, cnpj in lowered if needle in name or needle in cnpj]
+
+    def indexed():
+        for term in terms:
+            index.search(term)
+
+    return {
+        "rows": size,
+        "terms": len(terms),
+        "index_build_ms": round(build_ms, 3),
+        "linear_scan": timed(scan, repeat),
+        "ngram_index": timed(indexed, repeat),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara a busca ILIKE com a busca indexada de operadoras")
+    parser.add_argument("--terms", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--synthetic", type=int, default=50_000, help="Tamanho do cadastro sintético (0 para pular)")
+    parser.add_argument("--skip-database", action="store_true")
+    args = parser.parse_args()
+
+    report = {}
+    if not args.skip_database:
+        database = asyncio.run(benchmark_database(args.terms, args.repeat, args.seed))
+        if database:
+            report["database"] = database
+    if args.synthetic:
+        report["synthetic"] = benchmark_synthetic(args.synthetic, args.terms, args.repeat, args.seed)
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+import argparse
+import csv
+import io
+import json
+import sys
+import time
+import zipfile
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+DEMONSTRACOES_DIR = "demonstracoes_contabeis"
+CADASTRO_DIR = "operadoras_de_plano_de_saude_ativas"
+CADASTRO_FILE = "Relatorio_cadop.csv"
+QUARTER_COLUMNS = ["DATA", "REG_ANS", "CD_CONTA_CONTABIL", "DESCRICAO", "VL_SALDO_INICIAL", "VL_SALDO_FINAL"]
+CADASTRO_COLUMNS = ["REGISTRO_OPERADORA", "CNPJ", "Razao_Social", "Nome_Fantasia", "Modalidade", "UF"]
+
+# (conta, descrição, peso): as contas 41x entram no filtro EVENTO/SINISTRO do processador
+CONTAS = [
+    ("41", "EVENTOS/ SINISTROS CONHECIDOS OU AVISADOS DE ASSISTÊNCIA A SAÚDE MEDICO HOSPITALAR", 8),
+    ("411", "Eventos/Sinistros Conhecidos ou Avisados de Assistência a Saúde Médico Hospitalar", 6),
+    ("4111", "EVENTOS INDENIZÁVEIS LÍQUIDOS / SINISTROS RETIDOS", 10),
+    ("41111", "Eventos Indenizáveis Líquidos - Consultas Médicas", 6),
+    ("41112", "Eventos Indenizáveis Líquidos - Exames", 6),
+    ("41113", "Eventos Indenizáveis Líquidos - Internações", 5),
+    ("31", "CONTRAPRESTAÇÕES EFETIVAS DE PLANO DE ASSISTÊNCIA À SAÚDE", 10),
+    ("311", "Receitas com Operações de Assistência à Saúde", 8),
+    ("44", "OUTRAS DESPESAS OPERACIONAIS COM PLANOS DE ASSISTÊNCIA À SAÚDE", 8),
+    ("46", "DESPESAS ADMINISTRATIVAS", 10),
+    ("21", "PROVISÕES TÉCNICAS DE OPERAÇÕES DE ASSISTÊNCIA À SAÚDE", 8),
+    ("12", "APLICAÇÕES FINANCEIRAS", 5),
+    ("1", "ATIVO", 5),
+    ("2", "PASSIVO", 5),
+]
+MODALIDADES = [
+    "Medicina de Grupo", "Cooperativa Médica", "Odontologia de Grupo", "Cooperativa Odontológica",
+    "Autogestão", "Seguradora Especializada em Saúde", "Filantropia", "Administradora de Benefícios",
+]
+UFS = [
+    "SP", "RJ", "MG", "PR", "RS", "SC", "BA", "GO", "PE", "CE", "DF", "ES", "MT", "MS",
+    "PA", "AM", "MA", "PB", "RN", "AL", "PI", "SE", "TO", "RO", "AC", "AP", "RR",
+]
+NOMES = [
+    "SAÚDE", "ASSISTÊNCIA", "MÉDICA", "ODONTOLÓGICA", "COOPERATIVA", "UNIMED", "PLANO", "HOSPITALAR",
+    "SERVIÇOS", "ADMINISTRADORA", "BENEFÍCIOS", "SÃO", "PAULO", "PARANÁ", "GOIÁS", "CLÍNICA", "VIDA",
+    "BEM", "ESTAR", "CENTRAL", "NACIONAL", "REGIONAL", "SUL", "NORTE", "LESTE", "OESTE", "INTEGRADA",
+]
+SUFIXOS = ["LTDA", "S.A.", "S/A", "EIRELI", "COOPERATIVA DE TRABALHO MÉDICO", "ASSOCIAÇÃO"]
+CNPJ_WEIGHTS_1 = np.array([5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2])
+CNPJ_WEIGHTS_2 = np.array([6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2])
+
+
+def quarter_list(end_year: int, end_quarter: int, count: int) -> List[Tuple[int, int]]:
+    quarters = []
+    year, quarter = end_year, end_quarter
+    for _ in range(count):
+        quarters.append((year, quarter))
+        year, quarter = (year, quarter - 1) if quarter > 1 else (year - 1, 4)
+    return sorted(quarters)
+
+
+def _check_digit(digits: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    remainder = (digits * weights).sum(axis=1) % 11
+    return np.where(remainder < 2, 0, 11 - remainder)
+
+
+def valid_cnpjs(rng: np.random.Generator, count: int) -> List[str]:
+    base = rng.integers(0, 10, size=(count, 12))
+    first = _check_digit(base, CNPJ_WEIGHTS_1)
+    with_first = np.column_stack([base, first])
+    second = _check_digit(with_first, CNPJ_WEIGHTS_2)
+    digits = np.column_stack([with_first, second])
+    return ["".join(map(str, row)) for row in digits]
+
+
+def operadoras(rng: np.random.Generator, count: int) -> pd.DataFrame:
+    registros = rng.choice(np.arange(300000, 999999), size=count, replace=False)
+    nomes = [
+        " ".join(rng.choice(NOMES, size=rng.integers(1, 4))) + " " + rng.choice(SUFIXOS)
+        for _ in range(count)
+    ]
+    return pd.DataFrame({
+        "REGISTRO_OPERADORA": registros.astype(str),
+        "CNPJ": valid_cnpjs(rng, count),
+        "Razao_Social": nomes,
+        "Nome_Fantasia": [nome.split(" ")[0] for nome in nomes],
+        "Modalidade": rng.choice(MODALIDADES, size=count),
+        "UF": rng.choice(UFS, size=count, p=_skewed(len(UFS), 1.2)),
+    })
+
+
+def _skewed(count: int, exponent: float) -> np.ndarray:
+    weights = 1.0 / np.arange(1, count + 1) ** exponent
+    return weights / weights.sum()
+
+
+def write_quarter(
+    path: Path,
+    year: int,
+    quarter: int,
+    rows: int,
+    registros: np.ndarray,
+    rng: np.random.Generator,
+    chunk_rows: int,
+    compresslevel: int
+):
+    contas = np.array([conta for conta, _, _ in CONTAS])
+    descricoes = np.array([descricao for _, descricao, _ in CONTAS])
+    pesos = np.array([peso for _, _, peso in CONTAS], dtype=float)
+    pesos /= pesos.sum()
+    operadora_pesos = _skewed(len(registros), 0.8)
+    data = f"{year}-{(quarter - 1) * 3 + 1:02d}-01"
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED, compresslevel=compresslevel) as archive:
+        with archive.open(f"{quarter}T{year}.csv", "w", force_zip64=True) as raw:
+            text = io.TextIOWrapper(raw, encoding="latin1", newline="")
+            for start in range(0, rows, chunk_rows):
+                size = min(chunk_rows, rows - start)
+                conta = rng.choice(len(CONTAS), size=size, p=pesos)
+                saldo_final = rng.lognormal(mean=11, sigma=2, size=size)
+                # ~2% zerados ou negativos, como os estornos dos arquivos reais
+                saldo_final[rng.random(size) < 0.02] *= -1
+                frame = pd.DataFrame({
+                    "DATA": data,
+                    "REG_ANS": rng.choice(registros, size=size, p=operadora_pesos),
+                    "CD_CONTA_CONTABIL": contas[conta],
+                    "DESCRICAO": descricoes[conta],
+                    "VL_SALDO_INICIAL": saldo_final * rng.uniform(0.5, 1.0, size=size),
+                    "VL_SALDO_FINAL": saldo_final,
+                })
+                frame.to_csv(
+                    text,
+                    sep=";",
+                    index=False,
+                    header=start == 0,
+                    quoting=csv.QUOTE_ALL,
+                    float_format="%.2f",
+                    decimal=",",
+                    lineterminator="\n",
+                )
+            text.flush()
+            text.detach()
+
+
+def generate(
+    root: Path,
+    rows_per_quarter: int,
+    quarters: List[Tuple[int, int]],
+    num_operadoras: int,
+    seed: int = 42,
+    chunk_rows: int = 500_000,
+    compresslevel: int = 6
+) -> dict:
+    rng = np.random.default_rng(seed)
+    root = Path(root)
+    started = time.perf_counter()
+
+    cadastro = operadoras(rng, num_operadoras)
+    # Parte das operadoras dos demonstrativos não está no cadastro de ativas, e vice-versa
+    sem_cadastro = rng.choice(np.arange(100000, 299999), size=max(1, num_operadoras // 30), replace=False).astype(str)
+    com_despesas = cadastro["REGISTRO_OPERADORA"].sample(frac=0.95, random_state=seed).to_numpy()
+    registros = np.concatenate([com_despesas, sem_cadastro])
+
+    cadastro_path = root / CADASTRO_DIR / CADASTRO_FILE
+    cadastro_path.parent.mkdir(parents=True, exist_ok=True)
+    cadastro.to_csv(cadastro_path, sep=";", index=False, encoding="utf-8")
+
+    files = []
+    for year, quarter in quarters:
+        path = root / DEMONSTRACOES_DIR / str(year) / f"{quarter}T{year}.zip"
+        write_quarter(path, year, quarter, rows_per_quarter, registros, rng, chunk_rows, compresslevel)
+        files.append({"quarter": f"{quarter}T{year}", "path": str(path), "bytes": path.stat().st_size})
+        print(f"  {quarter}T{year}: {rows_per_quarter} linhas, {path.stat().st_size / 1e6:.1f} MB")
+
+    return {
+        "root": str(root),
+        "seed": seed,
+        "rows_per_quarter": rows_per_quarter,
+        "operadoras": num_operadoras,
+        "quarters": files,
+        "cadastro": str(cadastro_path),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera demonstrativos trimestrais e cadastro sintéticos no layout da ANS")
+    parser.add_argument("root", help="Diretório de saída (raiz do espelho HTTP)")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Linhas por trimestre")
+    parser.add_argument("--quarters", type=int, default=3)
+    parser.add_argument("--end", default="2025-3", help="Último trimestre, no formato ANO-TRIMESTRE")
+    parser.add_argument("--operadoras", type=int, default=1_500)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--compresslevel", type=int, default=6)
+    args = parser.parse_args()
+
+    end_year, end_quarter = (int(part) for part in args.end.split("-"))
+    summary = generate(
+        Path(args.root),
+        args.rows,
+        quarter_list(end_year, end_quarter, args.quarters),
+        args.operadoras,
+        seed=args.seed,
+        compresslevel=args.compresslevel,
+    )
+    json.dump(summary, sys.stdout, indent=2, ensure_ascii=False)
+    print()
+
+
+if __name__ == "__main__":
+    main()
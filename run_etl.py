@@ -1,60 +1,113 @@
 from src.etl.downloader import ANSDownloader
 from src.etl.processor import ANSProcessor
+from src.etl.manifest import RunManifest
+from src.etl.profiling import RunProfiler
+from src.etl.aggregates import add_period_sources
+import argparse
 import sys
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="ETL de despesas das operadoras ANS")
+    parser.add_argument("--workers", type=int, default=1, help="Processos para leitura dos arquivos (padrão: 1, serial)")
+    parser.add_argument("--extract", action="store_true", help="Extrai os ZIPs em disco em vez de ler os arquivos direto do ZIP")
+    parser.add_argument("--full-refresh", action="store_true", help="Ignora o manifesto e reprocessa todos os trimestres")
+    parser.add_argument("--load", action="store_true", help="Carrega os resultados no PostgreSQL (COPY + troca atômica das tabelas)")
+    parser.add_argument("--load-mode", choices=["replace", "upsert"], default="replace", help="replace: recria as tabelas via staging; upsert: atualiza por CNPJ/período")
+    parser.add_argument("--download-workers", type=int, default=3, help="Downloads simultâneos de trimestres (padrão: 3)")
+    parser.add_argument("--report", help="Relatório JSON da execução por etapa (padrão: data/processed/run_report.json)")
+    parser.add_argument("--profile", action="store_true", help="Grava cProfile e snapshot do tracemalloc da etapa mais lenta em data/processed/profile/")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
     print("\n--- ETL Pipeline ANS ---\n")
     
     try:
-        downloader = ANSDownloader()
+        downloader = ANSDownloader(max_workers=args.download_workers)
         processor = ANSProcessor()
+        profiler = RunProfiler(profile=args.profile, profile_dir=str(processor.output_dir / "profile"))
         
-        print("Baixando e extraindo arquivos dos últimos 3 trimestres")
+        print("Baixando arquivos dos últimos 3 trimestres")
         
         try:
-            quarters = downloader.get_available_quarters()
+            with profiler.stage("listagem") as stats:
+                quarters = downloader.get_available_quarters()
+                stats.add_rows(rows_out=len(quarters))
             
             if not quarters:
                 print("Erro: Nenhum trimestre encontrado na API da ANS.")
                 print("Verifique sua conexão com a internet e tente novamente.")
                 sys.exit(1)
             
-            all_files = []
-            for year, quarter, file_url in quarters:
-                print(f"  Processando {quarter}{year}...", end=" ")
-                zip_file = downloader.download_quarter_files(year, quarter, file_url)
-                extracted = downloader.extract_zip(zip_file)
-                all_files.extend(extracted)
-                print(f"({len(extracted)} arquivos)")
-            
-            if not all_files:
-                print("Erro: Nenhum arquivo extraído dos ZIPs.")
-                sys.exit(1)
-                
+            with profiler.stage("download") as stats:
+                zip_files = downloader.download_quarters(quarters)
+                stats.add_rows(rows_in=len(quarters), rows_out=len(zip_files))
+                stats.extra["zip_bytes"] = sum(path.stat().st_size for path in zip_files)
+        
         except Exception as e:
             print(f"Erro ao acessar a API da ANS: {str(e)}")
             print("Verifique sua conexão e tente novamente.")
             sys.exit(1)
         
-        print(f"Total extraído: {len(all_files)} arquivos\n")
-        
-        print("Processando arquivos e identificando dados de despesas...")
-        data_files = processor.find_despesas_files(all_files)
-        
-        if not data_files:
-            print("Erro: Nenhum arquivo identificado para processamento.")
-            sys.exit(1)
-        
-        print(f"Encontrados: {len(data_files)} arquivos para processar\n")
-        
-        print("Processando e consolidando dados...")
-        data = processor.process_files(data_files)
-        
-        if not data:
+        manifest = RunManifest(str(processor.output_dir))
+        if args.full_refresh:
+            print("\nReprocessamento completo solicitado (--full-refresh)")
+            manifest.reset()
+        
+        print("\nProcessando arquivos e identificando dados de despesas...")
+        partitions = []
+        period_sources = {}
+        for (year, quarter, file_url), zip_file in zip(quarters, zip_files):
+            key = f"{quarter}{year}"
+            with profiler.stage("manifesto") as stats:
+                checksum = manifest.checksum(zip_file)
+                current = manifest.is_current(key, checksum)
+                if current:
+                    partitions.append(manifest.load_partition(key))
+                    add_period_sources(period_sources, partitions[-1], checksum)
+                    stats.add_rows(rows_out=len(partitions[-1]))
+            
+            if current:
+                print(f"  {key}: sem alterações desde a última execução, reutilizando partição")
+                continue
+            
+            print(f"  {key}: processando...")
+            with profiler.stage("extracao") as stats:
+                if args.extract:
+                    files = downloader.extract_zip(zip_file)
+                else:
+                    files = downloader.list_zip_members(zip_file)
+                stats.add_rows(rows_out=len(files))
+            
+            with profiler.stage("identificacao") as stats:
+                data_files = processor.find_despesas_files(files)
+                stats.add_rows(rows_in=len(files), rows_out=len(data_files))
+            if not data_files:
+                print(f"  {key}: nenhum arquivo identificado para processamento")
+            
+            with profiler.stage("processamento") as stats:
+                data = processor.process_files(data_files, workers=args.workers)
+                stats.add_rows(rows_in=len(data_files), rows_out=len(data))
+            
+            with profiler.stage("agregacao_trimestre") as stats:
+                partition = processor.aggregate_despesas(data)
+                manifest.save_partition(key, zip_file, checksum, partition)
+                add_period_sources(period_sources, partition, checksum)
+                stats.add_rows(rows_in=len(data), rows_out=len(partition))
+            del data
+            partitions.append(partition)
+        
+        manifest.retain(f"{quarter}{year}" for year, quarter, _ in quarters)
+        manifest.save()
+        
+        if all(len(partition) == 0 for partition in partitions):
             print("Erro: Nenhum registro de eventos/sinistros extraído dos arquivos.")
             sys.exit(1)
         
-        df_consolidated = processor.consolidate_data(data)
+        print("\nConsolidando dados...")
+        with profiler.stage("consolidacao") as stats:
+            df_consolidated = processor.consolidate_data(partitions=partitions)
+            stats.add_rows(rows_in=sum(len(partition) for partition in partitions), rows_out=len(df_consolidated))
         
         if len(df_consolidated) == 0:
             print("Erro: Nenhum registro válido após a validação.")
@@ -63,25 +116,51 @@ def main():
         print(f"Consolidado: {len(df_consolidated)} registros\n")
         
         print("Baixando dados do cadastro de operadoras...")
-        cadastro_path = processor.download_operadoras_cadastro()
+        with profiler.stage("cadastro") as stats:
+            cadastro_path = processor.download_operadoras_cadastro()
+            stats.add_rows(rows_out=len(processor.cadastro.operadoras()))
         print("Cadastro baixado\n")
         
         print("Enriquecendo dados com informações do cadastro...")
-        df_enriched = processor.enrich_data("consolidado_despesas.csv", "operadoras_cadastro.csv")
+        with profiler.stage("enriquecimento") as stats:
+            df_enriched = processor.enrich_data(df_consolidated)
+            stats.add_rows(rows_in=len(df_consolidated), rows_out=len(df_enriched))
         print(f"Enriquecido: {len(df_enriched)} registros\n")
         
         print("Agregando dados por nome da empresa e estado...")
-        df_aggregated = processor.aggregate_data("despesas_enriquecidas.csv")
+        with profiler.stage("agregacao") as stats:
+            df_aggregated = processor.aggregate_data(df_enriched, period_sources=period_sources, full_refresh=args.full_refresh)
+            stats.add_rows(rows_in=len(df_enriched), rows_out=len(df_aggregated))
         print(f"Gerado: {len(df_aggregated)} agregações\n")
         
+        if args.load:
+            from src.etl.loader import PostgresLoader
+            
+            print(f"Carregando dados no PostgreSQL (modo {args.load_mode})...")
+            with profiler.stage("carga") as stats:
+                loader = PostgresLoader()
+                frames = loader.prepare_frames(processor.cadastro.operadoras(), df_consolidated, df_aggregated)
+                loader.load(frames, mode=args.load_mode)
+                stats.add_rows(rows_in=sum(len(frame) for frame in frames.values()))
+            print("Carga concluída\n")
+        
+        report_path = args.report or str(processor.output_dir / "run_report.json")
+        report = profiler.save(report_path)
+        
         print("--- Pipeline concluído com sucesso ---\n")
+        profiler.print_summary()
+        print(f"\nRelatório da execução: {report_path}")
+        if report.get("profile"):
+            print(f"Perfil da etapa mais lenta ({report['profile']['stage']}): {report['profile']['cprofile_summary']}")
+        print()
         print("Arquivos de saída em data/processed/:")
         print(f"  - consolidado_despesas.csv ({len(df_consolidated)} registros)")
         print(f"  - consolidado_despesas.zip")
         print(f"  - operadoras_cadastro.csv")
         print(f"  - despesas_enriquecidas.csv ({len(df_enriched)} registros)")
-        print(f"  - despesas_agregadas.csv ({len(df_aggregated)} agregações)\n")
-        
+        print(f"  - despesas_agregadas.csv ({len(df_aggregated)} agregações)")
+        print(f"  - *.parquet (mesmos dados em formato colunar tipado)\n")
+    
     except KeyboardInterrupt:
         print("\n\nOperação cancelada pelo usuário.")
         sys.exit(1)
@@ -22,6 +22,8 @@ CREATE TABLE IF NOT EXISTS operadoras_cadastro (
     razao_social VARCHAR(255) NOT NULL,
     modalidade VARCHAR(100),
     uf VARCHAR(2),
+    -- Razão social minúscula e sem acentos, usada pela busca (mesma regra de src/models/operadora.py)
+    razao_social_busca TEXT GENERATED ALWAYS AS (translate(lower(razao_social), 'ÁÀÂÃÄÉÈÊËÍÌÎÏÓÒÔÕÖÚÙÛÜÇÑáàâãäéèêëíìîïóòôõöúùûüçñ', 'aaaaaeeeeiiiiooooouuuucnaaaaaeeeeiiiiooooouuuucn')) STORED,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     
     CONSTRAINT check_cnpj_formato CHECK (cnpj ~ '^[0-9]{14}$'),
@@ -29,8 +31,15 @@ CREATE TABLE IF NOT EXISTS operadoras_cadastro (
 );
 
 CREATE INDEX idx_cadastro_cnpj ON operadoras_cadastro(cnpj);
+-- Prefixo de CNPJ (LIKE '123%') independente da collation do banco
+CREATE INDEX idx_cadastro_cnpj_prefixo ON operadoras_cadastro(cnpj varchar_pattern_ops);
 CREATE INDEX idx_cadastro_uf ON operadoras_cadastro(uf);
-CREATE INDEX idx_cadastro_razao_social ON operadoras_cadastro(razao_social);
+-- (razao_social, id) atende a ordenação e a paginação por cursor de /api/operadoras
+CREATE INDEX idx_cadastro_razao_social_id ON operadoras_cadastro(razao_social, id);
+-- Busca por substring/similaridade (ILIKE '%termo%' e operador %); requer a extensão pg_trgm.
+-- Sem ela, a API mantém um índice n-gram em memória e este comando pode ser ignorado.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX idx_cadastro_razao_social_trgm ON operadoras_cadastro USING gin (razao_social_busca gin_trgm_ops);
 
 CREATE TABLE IF NOT EXISTS despesas_consolidadas (
     id SERIAL PRIMARY KEY,
@@ -54,6 +63,8 @@ CREATE TABLE IF NOT EXISTS despesas_consolidadas (
 
 CREATE INDEX idx_despesas_cnpj ON despesas_consolidadas(cnpj);
 CREATE INDEX idx_despesas_ano_trimestre ON despesas_consolidadas(ano, trimestre);
+-- Paginação por cursor de /api/operadoras/{cnpj}/despesas (ano, trimestre, id decrescentes)
+CREATE INDEX idx_despesas_cnpj_periodo_id ON despesas_consolidadas(cnpj, ano, trimestre, id);
 CREATE INDEX idx_despesas_valor ON despesas_consolidadas(valor_despesas DESC);
 
 CREATE TABLE IF NOT EXISTS despesas_agregadas (
@@ -74,3 +85,95 @@ CREATE INDEX idx_agregadas_razao_uf ON despesas_agregadas(razao_social, uf);
 CREATE INDEX idx_agregadas_uf ON despesas_agregadas(uf);
 CREATE INDEX idx_agregadas_total ON despesas_agregadas(total_despesas DESC);
 
+-- Estatísticas pré-calculadas para /api/estatisticas
+-- Atualizadas a cada carga (run_etl.py --load ou 02_import_data.sql),
+-- o endpoint lê poucas linhas independente do volume de despesas_consolidadas.
+-- Os blocos entre marcadores [loader:...] também são executados por src/etl/loader.py.
+
+-- [loader:resumos]
+
+CREATE TABLE IF NOT EXISTS estatisticas_gerais (
+    id INTEGER PRIMARY KEY,
+    total_operadoras INTEGER NOT NULL,
+    total_despesas NUMERIC(20, 2) NOT NULL,
+    media_despesas NUMERIC(15, 2) NOT NULL,
+    total_registros INTEGER NOT NULL,
+    atualizado_em TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS estatisticas_top_operadoras (
+    posicao INTEGER PRIMARY KEY,
+    cnpj VARCHAR(14) NOT NULL,
+    razao_social VARCHAR(255) NOT NULL,
+    total_despesas NUMERIC(20, 2) NOT NULL,
+    uf VARCHAR(2)
+);
+
+CREATE TABLE IF NOT EXISTS estatisticas_uf (
+    uf VARCHAR(2) PRIMARY KEY,
+    total_despesas NUMERIC(20, 2) NOT NULL,
+    num_operadoras INTEGER NOT NULL,
+    percentual NUMERIC(5, 2) NOT NULL
+);
+
+-- Resumos das consultas 03-05 para /api/analytics, recalculados a cada carga.
+-- Cada período filtrável tem sua linha: ano = 0 representa todos os anos e
+-- trimestre = '*' todos os trimestres.
+
+CREATE TABLE IF NOT EXISTS analytics_crescimento (
+    ano INTEGER NOT NULL,
+    cnpj VARCHAR(14) NOT NULL,
+    razao_social VARCHAR(255) NOT NULL,
+    primeiro_ano INTEGER NOT NULL,
+    primeiro_trimestre VARCHAR(10) NOT NULL,
+    valor_inicial NUMERIC(15, 2) NOT NULL,
+    ultimo_ano INTEGER NOT NULL,
+    ultimo_trimestre VARCHAR(10) NOT NULL,
+    valor_final NUMERIC(15, 2) NOT NULL,
+    num_trimestres INTEGER NOT NULL,
+    crescimento_percentual NUMERIC,
+    PRIMARY KEY (ano, cnpj)
+);
+
+CREATE INDEX IF NOT EXISTS idx_analytics_crescimento_ranking ON analytics_crescimento (ano, crescimento_percentual DESC);
+
+CREATE TABLE IF NOT EXISTS analytics_periodo (
+    ano INTEGER NOT NULL,
+    trimestre VARCHAR(10) NOT NULL,
+    total_despesas NUMERIC(20, 2) NOT NULL,
+    media_despesas NUMERIC NOT NULL,
+    num_registros INTEGER NOT NULL,
+    num_operadoras INTEGER NOT NULL,
+    PRIMARY KEY (ano, trimestre)
+);
+
+CREATE TABLE IF NOT EXISTS analytics_uf (
+    ano INTEGER NOT NULL,
+    trimestre VARCHAR(10) NOT NULL,
+    uf VARCHAR(2) NOT NULL,
+    total_despesas NUMERIC(20, 2) NOT NULL,
+    media_despesas NUMERIC NOT NULL,
+    num_operadoras INTEGER NOT NULL,
+    num_registros INTEGER NOT NULL,
+    PRIMARY KEY (ano, trimestre, uf)
+);
+
+CREATE TABLE IF NOT EXISTS analytics_acima_media (
+    ano INTEGER NOT NULL,
+    trimestre VARCHAR(10) NOT NULL,
+    cnpj VARCHAR(14) NOT NULL,
+    razao_social VARCHAR(255) NOT NULL,
+    trimestres_acima_media INTEGER NOT NULL,
+    PRIMARY KEY (ano, trimestre, cnpj)
+);
+
+-- [/loader:resumos]
+
+-- Versão dos dados publicada a cada carga; invalida o cache de respostas da API
+-- [loader:versao]
+CREATE TABLE IF NOT EXISTS data_version (
+    id INTEGER PRIMARY KEY,
+    versao BIGINT NOT NULL,
+    atualizado_em TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+-- [/loader:versao]
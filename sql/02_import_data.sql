@@ -50,6 +50,141 @@ LEFT JOIN operadoras_cadastro oc ON dc.cnpj = oc.cnpj
 GROUP BY dc.razao_social, oc.uf
 ORDER BY total_despesas DESC;
 
+-- Despesas desta carga: o bloco seguinte só recalcula os resumos das operadoras que aparecem aqui.
+-- Os blocos entre marcadores [loader:...] também são executados por src/etl/loader.py.
+CREATE TEMP TABLE carga_despesas AS SELECT cnpj, ano, trimestre FROM despesas_consolidadas;
+
+\echo 'Atualizando estatísticas e resumos de analytics...'
+-- [loader:atualizacao]
+DELETE FROM estatisticas_gerais;
+INSERT INTO estatisticas_gerais (id, total_operadoras, total_despesas, media_despesas, total_registros, atualizado_em)
+SELECT
+    1,
+    (SELECT COUNT(*) FROM operadoras_cadastro),
+    COALESCE(SUM(valor_despesas), 0),
+    COALESCE(AVG(valor_despesas), 0),
+    COUNT(*),
+    CURRENT_TIMESTAMP
+FROM despesas_consolidadas;
+
+DELETE FROM estatisticas_top_operadoras;
+INSERT INTO estatisticas_top_operadoras (posicao, cnpj, razao_social, total_despesas, uf)
+SELECT
+    ROW_NUMBER() OVER (ORDER BY top.total DESC),
+    top.cnpj,
+    top.razao_social,
+    top.total,
+    oc.uf
+FROM (
+    SELECT cnpj, razao_social, SUM(valor_despesas) AS total
+    FROM despesas_consolidadas
+    GROUP BY cnpj, razao_social
+    ORDER BY total DESC
+    LIMIT 5
+) top
+LEFT JOIN operadoras_cadastro oc ON oc.cnpj = top.cnpj;
+
+DELETE FROM estatisticas_uf;
+INSERT INTO estatisticas_uf (uf, total_despesas, num_operadoras, percentual)
+SELECT
+    oc.uf,
+    SUM(dc.valor_despesas),
+    COUNT(DISTINCT dc.cnpj),
+    COALESCE(ROUND(SUM(dc.valor_despesas) * 100 / NULLIF((SELECT SUM(valor_despesas) FROM despesas_consolidadas), 0), 2), 0)
+FROM operadoras_cadastro oc
+JOIN despesas_consolidadas dc ON oc.cnpj = dc.cnpj
+WHERE oc.uf IS NOT NULL
+GROUP BY oc.uf;
+
+DELETE FROM analytics_crescimento WHERE cnpj IN (SELECT cnpj FROM carga_despesas);
+INSERT INTO analytics_crescimento (
+    ano, cnpj, razao_social, primeiro_ano, primeiro_trimestre, valor_inicial,
+    ultimo_ano, ultimo_trimestre, valor_final, num_trimestres, crescimento_percentual
+)
+SELECT
+    ano, cnpj, razao_social, primeiro_ano, primeiro_trimestre, valor_inicial,
+    ultimo_ano, ultimo_trimestre, valor_final, num_trimestres,
+    CASE WHEN num_trimestres >= 2 AND valor_inicial > 0 AND valor_final > 0
+        THEN ROUND((valor_final - valor_inicial) / valor_inicial * 100, 2)
+    END
+FROM (
+    SELECT
+        COALESCE(ano, 0) AS ano,
+        cnpj,
+        MAX(razao_social) AS razao_social,
+        (ARRAY_AGG(ano ORDER BY ano, trimestre))[1] AS primeiro_ano,
+        (ARRAY_AGG(trimestre ORDER BY ano, trimestre))[1] AS primeiro_trimestre,
+        (ARRAY_AGG(valor_despesas ORDER BY ano, trimestre))[1] AS valor_inicial,
+        (ARRAY_AGG(ano ORDER BY ano DESC, trimestre DESC))[1] AS ultimo_ano,
+        (ARRAY_AGG(trimestre ORDER BY ano DESC, trimestre DESC))[1] AS ultimo_trimestre,
+        (ARRAY_AGG(valor_despesas ORDER BY ano DESC, trimestre DESC))[1] AS valor_final,
+        COUNT(*) AS num_trimestres
+    FROM despesas_consolidadas
+    WHERE cnpj IN (SELECT cnpj FROM carga_despesas)
+    GROUP BY GROUPING SETS ((cnpj, ano), (cnpj))
+) extremos;
+
+-- Linhas por período afetadas pela carga: os trimestres carregados e as linhas "todos"
+-- (ano = 0 / trimestre = '*') que os contêm. Os demais períodos não são reescritos.
+CREATE TEMP TABLE carga_periodos AS
+SELECT ano, trimestre FROM carga_despesas
+UNION SELECT ano, '*' FROM carga_despesas
+UNION SELECT 0, trimestre FROM carga_despesas
+UNION SELECT 0, '*' FROM carga_despesas;
+
+DELETE FROM analytics_periodo p USING carga_periodos c WHERE p.ano = c.ano AND p.trimestre = c.trimestre;
+INSERT INTO analytics_periodo (ano, trimestre, total_despesas, media_despesas, num_registros, num_operadoras)
+SELECT
+    COALESCE(ano, 0),
+    COALESCE(trimestre, '*'),
+    COALESCE(SUM(valor_despesas), 0),
+    COALESCE(AVG(valor_despesas), 0),
+    COUNT(*),
+    COUNT(DISTINCT cnpj)
+FROM despesas_consolidadas
+GROUP BY GROUPING SETS ((ano, trimestre), (ano), (trimestre), ())
+HAVING (COALESCE(ano, 0), COALESCE(trimestre, '*')) IN (SELECT ano, trimestre FROM carga_periodos);
+
+DELETE FROM analytics_uf u USING carga_periodos c WHERE u.ano = c.ano AND u.trimestre = c.trimestre;
+INSERT INTO analytics_uf (ano, trimestre, uf, total_despesas, media_despesas, num_operadoras, num_registros)
+SELECT
+    COALESCE(dc.ano, 0),
+    COALESCE(dc.trimestre, '*'),
+    oc.uf,
+    SUM(dc.valor_despesas),
+    AVG(dc.valor_despesas),
+    COUNT(DISTINCT dc.cnpj),
+    COUNT(*)
+FROM despesas_consolidadas dc
+JOIN operadoras_cadastro oc ON oc.cnpj = dc.cnpj
+WHERE oc.uf IS NOT NULL
+GROUP BY GROUPING SETS ((oc.uf, dc.ano, dc.trimestre), (oc.uf, dc.ano), (oc.uf, dc.trimestre), (oc.uf))
+HAVING (COALESCE(dc.ano, 0), COALESCE(dc.trimestre, '*')) IN (SELECT ano, trimestre FROM carga_periodos);
+
+DELETE FROM analytics_acima_media a USING carga_periodos c WHERE a.ano = c.ano AND a.trimestre = c.trimestre;
+INSERT INTO analytics_acima_media (ano, trimestre, cnpj, razao_social, trimestres_acima_media)
+SELECT p.ano, p.trimestre, dc.cnpj, MAX(dc.razao_social), COUNT(*)
+FROM analytics_periodo p
+JOIN carga_periodos c ON c.ano = p.ano AND c.trimestre = p.trimestre
+JOIN despesas_consolidadas dc
+    ON (p.ano = 0 OR dc.ano = p.ano)
+    AND (p.trimestre = '*' OR dc.trimestre = p.trimestre)
+WHERE dc.valor_despesas > p.media_despesas
+GROUP BY p.ano, p.trimestre, dc.cnpj;
+
+DROP TABLE carga_periodos;
+-- [/loader:atualizacao]
+
+DROP TABLE carga_despesas;
+
+-- [loader:publicacao]
+INSERT INTO data_version (id, versao, atualizado_em)
+VALUES (1, 1, CURRENT_TIMESTAMP)
+ON CONFLICT (id) DO UPDATE SET
+    versao = data_version.versao + 1,
+    atualizado_em = EXCLUDED.atualizado_em;
+-- [/loader:publicacao]
+
 \echo 'Verificação pós-importação:'
 SELECT 'Operadoras cadastradas:' as tabela, COUNT(*) as registros FROM operadoras_cadastro
 UNION ALL
@@ -1,4 +1,5 @@
 -- Query 1: Top 5 operadoras com maior crescimento percentual
+-- A API serve esta consulta pré-calculada em /api/analytics/crescimento (tabela analytics_crescimento)
 --
 -- DESAFIO: Operadoras podem não ter todos os trimestres
 --
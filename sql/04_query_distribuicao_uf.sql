@@ -1,4 +1,5 @@
 -- Query 2: Distribuição de despesas por UF
+-- A API serve esta consulta pré-calculada em /api/analytics/distribuicao-uf (tabela analytics_uf)
 --
 -- DESAFIO: Calcular média por operadora, não apenas total
 --
@@ -1,4 +1,5 @@
 -- Query 3: Operadoras acima da média em pelo menos 2 trimestres
+-- A API serve esta consulta pré-calculada em /api/analytics/acima-media (tabela analytics_acima_media)
 --
 -- ABORDAGEM: CTEs com agregações
 --
@@ -0,0 +1,13 @@
+from typing import Optional
+
+TRIMESTRE_PATTERN = "^[1-4][tT]?$"
+
+
+def limpar_cnpj(cnpj: str) -> str:
+    return cnpj.replace(".", "").replace("/", "").replace("-", "").strip()
+
+
+def normalizar_trimestre(trimestre: Optional[str]) -> Optional[str]:
+    if not trimestre:
+        return None
+    return f"{trimestre.upper().rstrip('T')}T"
@@ -1,11 +1,32 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.middleware.cors import CORSMiddleware
-from src.api.routes import operadoras, estatisticas
+from sqlalchemy.exc import SQLAlchemyError
+from src.api.routes import operadoras, estatisticas, export, analytics
+from src.api.search import get_operadora_search
+from src.api.metrics import MetricsMiddleware, instrument_engine, metrics_endpoint
+from src.core.database import AsyncSessionLocal, async_engine
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    async with AsyncSessionLocal() as db:
+        try:
+            print(f"Busca de operadoras: {await get_operadora_search().warm(db)}")
+        except (SQLAlchemyError, OSError) as e:
+            print(f"Índice de busca não carregado na inicialização: {e}")
+    yield
+    await async_engine.dispose()
+
 
 app = FastAPI(
     title="ANS Operadoras API",
     description="API para consulta de operadoras de planos de saúde e suas despesas",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 app.add_middleware(
@@ -14,10 +35,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+app.add_middleware(MetricsMiddleware)
+instrument_engine(async_engine.sync_engine)
 
 app.include_router(operadoras.router, prefix="/api", tags=["Operadoras"])
 app.include_router(estatisticas.router, prefix="/api", tags=["Estatísticas"])
+app.include_router(export.router, prefix="/api", tags=["Exportação"])
+app.include_router(analytics.router, prefix="/api", tags=["Analytics"])
 
 
 @app.get("/")
@@ -28,3 +55,8 @@ def root():
 @app.get("/health")
 def health():
     return {"status": "healthy"}
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return metrics_endpoint()
@@ -0,0 +1,165 @@
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import Response
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from src.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Latência das requisições HTTP por rota",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Requisições HTTP em andamento",
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Queries executadas por requisição",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55),
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds",
+    "Tempo gasto no banco por requisição",
+    ["route"],
+)
+QUERY_BUDGET_EXCEEDED = Counter(
+    "http_request_query_budget_exceeded_total",
+    "Requisições acima do orçamento de queries",
+    ["route"],
+)
+POOL_WAIT = Histogram(
+    "db_pool_wait_seconds",
+    "Espera para obter uma conexão do pool (inclui abrir conexões novas e o pre-ping)",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_seconds: float = 0.0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_stats() -> Optional[RequestStats]:
+    return _request_stats.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start"].pop()
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += time.perf_counter() - started
+
+
+def _transaction_created(session, transaction):
+    if transaction.parent is None:
+        session.info["connection_requested"] = time.perf_counter()
+
+
+def _connection_acquired(session, transaction, connection):
+    requested = session.info.pop("connection_requested", None)
+    if requested is not None:
+        POOL_WAIT.observe(time.perf_counter() - requested)
+
+
+class PoolCollector:
+    def __init__(self, engine: Engine, name: str):
+        self.engine = engine
+        self.name = name
+    
+    def collect(self):
+        pool = self.engine.pool
+        for metric, description, value in (
+            ("db_pool_size", "Tamanho configurado do pool", pool.size()),
+            ("db_pool_checked_out", "Conexões em uso", pool.checkedout()),
+            ("db_pool_checked_in", "Conexões ociosas no pool", pool.checkedin()),
+            ("db_pool_overflow", "Conexões além de pool_size (negativo = ainda não abertas)", pool.overflow()),
+        ):
+            gauge = GaugeMetricFamily(metric, description, labels=["engine"])
+            gauge.add_metric([self.name], value)
+            yield gauge
+
+
+def instrument_engine(engine: Engine, name: str = "api"):
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    
+    # O pool não tem evento de "pedido de conexão": a espera vai do início da transação da sessão
+    # (ainda sem conexão) até after_begin, quando o pool entregou a conexão já checada pelo pre-ping
+    event.listen(Session, "after_transaction_create", _transaction_created)
+    event.listen(Session, "after_begin", _connection_acquired)
+    REGISTRY.register(PoolCollector(engine, name))
+
+
+class MetricsMiddleware:
+    def __init__(self, app, query_budget: Optional[int] = None):
+        self.app = app
+        self.query_budget = query_budget if query_budget is not None else get_settings().API_QUERY_BUDGET
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        started = time.perf_counter()
+        status = {"code": 500}
+        
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                timing = (
+                    f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries", '
+                    f"app;dur={elapsed_ms:.1f}"
+                )
+                message.setdefault("headers", []).append((b"server-timing", timing.encode("latin-1")))
+            await send(message)
+        
+        REQUESTS_IN_PROGRESS.inc()
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            REQUESTS_IN_PROGRESS.dec()
+            _request_stats.reset(token)
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            elapsed = time.perf_counter() - started
+            REQUEST_LATENCY.labels(scope["method"], route_path, str(status["code"])).observe(elapsed)
+            REQUEST_DB_QUERIES.labels(route_path).observe(stats.queries)
+            REQUEST_DB_SECONDS.labels(route_path).observe(stats.db_seconds)
+            if self.query_budget and stats.queries > self.query_budget:
+                QUERY_BUDGET_EXCEEDED.labels(route_path).inc()
+                logger.warning(
+                    "Orçamento de queries excedido: %s %s - %d queries (limite %d), %.1f ms no banco, %.1f ms total",
+                    scope["method"], scope["path"], stats.queries, self.query_budget,
+                    stats.db_seconds * 1000, elapsed * 1000
+                )
+
+
+def metrics_endpoint() -> Response:
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
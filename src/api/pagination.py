@@ -0,0 +1,65 @@
+import base64
+import json
+import math
+from typing import Any, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+TOTAL_MODES = ("exact", "estimated", "none")
+
+
+def encode_cursor(values: List[Any]) -> str:
+    raw = json.dumps(values, default=str, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, types: Tuple[type, ...]) -> Optional[List[Any]]:
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    if not isinstance(values, list) or len(values) != len(types):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    # Cada posição precisa ter o tipo da coluna do keyset; senão o asyncpg rejeitaria o parâmetro com erro 500
+    for value, expected in zip(values, types):
+        if isinstance(value, bool) or not isinstance(value, expected):
+            raise HTTPException(status_code=400, detail="Cursor inválido")
+    return values
+
+
+async def estimate_count(db: AsyncSession, stmt: Select) -> int:
+    # Estimativa do planner (EXPLAIN) em vez de varrer o conjunto filtrado; fora do PostgreSQL conta de fato
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        return await exact_count(db, stmt)
+    # Parâmetros vinculados ($1, $2...) como na query real: o termo de busca nunca entra no texto do SQL
+    compiled = stmt.compile(dialect=bind.dialect, compile_kwargs={"render_postcompile": True})
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    connection = await db.connection()
+    plan = (await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", params)).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def exact_count(db: AsyncSession, stmt: Select) -> int:
+    return await db.scalar(select(func.count()).select_from(stmt.order_by(None).subquery()))
+
+
+async def count_total(db: AsyncSession, stmt: Select, mode: str) -> Optional[int]:
+    if mode == "none":
+        return None
+    if mode == "estimated":
+        return await estimate_count(db, stmt)
+    return await exact_count(db, stmt)
+
+
+def page_count(total: Optional[int], limit: int) -> Optional[int]:
+    if total is None:
+        return None
+    return math.ceil(total / limit) if total > 0 else 1
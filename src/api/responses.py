@@ -0,0 +1,22 @@
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi import Response
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+def _default(value: Any):
+    # Mesmo formato do Pydantic para Decimal: string, sem perder precisão
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Tipo não serializável: {type(value).__name__}")
+
+
+def encode_json(payload: Any) -> bytes:
+    return orjson.dumps(payload, default=_default)
+
+
+def json_bytes_response(body: bytes, status_code: int = 200) -> Response:
+    return Response(content=body, status_code=status_code, media_type=JSON_MEDIA_TYPE)
@@ -0,0 +1,180 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
+from decimal import Decimal
+from src.core.database import get_db
+from src.core.cache import get_response_cache
+from src.api.filters import TRIMESTRE_PATTERN, normalizar_trimestre
+from src.models.operadora import (
+    ANALYTICS_TODOS_ANOS,
+    ANALYTICS_TODOS_TRIMESTRES,
+    AnalyticsCrescimento,
+    AnalyticsPeriodo,
+    AnalyticsUF,
+    AnalyticsAcimaMedia
+)
+from src.api.schemas import (
+    CrescimentoOperadora,
+    CrescimentoResponse,
+    DistribuicaoUFPeriodo,
+    DistribuicaoUFResponse,
+    OperadoraAcimaMedia,
+    AcimaMediaResponse
+)
+
+router = APIRouter()
+
+
+def _periodo(ano: Optional[int], trimestre: Optional[str] = None):
+    return (
+        ano if ano is not None else ANALYTICS_TODOS_ANOS,
+        trimestre or ANALYTICS_TODOS_TRIMESTRES
+    )
+
+
+@router.get("/analytics/crescimento", response_model=CrescimentoResponse)
+async def crescimento(
+    limit: int = Query(5, ge=1, le=100, description="Quantidade de operadoras (top N)"),
+    ano: Optional[int] = Query(None, ge=2000, le=2100, description="Compara primeiro e último trimestre dentro do ano"),
+    min_trimestres: int = Query(2, ge=2, description="Mínimo de trimestres com despesas"),
+    db: AsyncSession = Depends(get_db)
+):
+    return await get_response_cache().get_or_compute(
+        "analytics_crescimento",
+        {"limit": limit, "ano": ano, "min_trimestres": min_trimestres},
+        db,
+        lambda: _crescimento(db, limit, ano, min_trimestres)
+    )
+
+
+async def _crescimento(db: AsyncSession, limit: int, ano: Optional[int], min_trimestres: int) -> CrescimentoResponse:
+    ano_filtro, _ = _periodo(ano)
+    rows = await db.scalars(
+        select(AnalyticsCrescimento).where(
+            AnalyticsCrescimento.ano == ano_filtro,
+            AnalyticsCrescimento.crescimento_percentual.isnot(None),
+            AnalyticsCrescimento.num_trimestres >= min_trimestres
+        ).order_by(
+            AnalyticsCrescimento.crescimento_percentual.desc(),
+            AnalyticsCrescimento.cnpj
+        ).limit(limit)
+    )
+    
+    return CrescimentoResponse(
+        ano=ano,
+        min_trimestres=min_trimestres,
+        data=[
+            CrescimentoOperadora(
+                cnpj=item.cnpj,
+                razao_social=item.razao_social,
+                primeiro_periodo=f"{item.primeiro_ano}/{item.primeiro_trimestre}",
+                ultimo_periodo=f"{item.ultimo_ano}/{item.ultimo_trimestre}",
+                despesa_inicial=item.valor_inicial,
+                despesa_final=item.valor_final,
+                crescimento_percentual=item.crescimento_percentual,
+                num_trimestres=item.num_trimestres
+            )
+            for item in rows
+        ]
+    )
+
+
+@router.get("/analytics/distribuicao-uf", response_model=DistribuicaoUFResponse)
+async def distribuicao_uf(
+    limit: int = Query(5, ge=1, le=27, description="Quantidade de UFs (top N por total de despesas)"),
+    ano: Optional[int] = Query(None, ge=2000, le=2100),
+    trimestre: Optional[str] = Query(None, pattern=TRIMESTRE_PATTERN, description="1T a 4T"),
+    db: AsyncSession = Depends(get_db)
+):
+    trimestre = normalizar_trimestre(trimestre)
+    return await get_response_cache().get_or_compute(
+        "analytics_distribuicao_uf",
+        {"limit": limit, "ano": ano, "trimestre": trimestre},
+        db,
+        lambda: _distribuicao_uf(db, limit, ano, trimestre)
+    )
+
+
+async def _distribuicao_uf(db: AsyncSession, limit: int, ano: Optional[int], trimestre: Optional[str]) -> DistribuicaoUFResponse:
+    ano_filtro, trimestre_filtro = _periodo(ano, trimestre)
+    rows = await db.scalars(
+        select(AnalyticsUF).where(
+            AnalyticsUF.ano == ano_filtro,
+            AnalyticsUF.trimestre == trimestre_filtro
+        ).order_by(
+            AnalyticsUF.total_despesas.desc()
+        ).limit(limit)
+    )
+    
+    return DistribuicaoUFResponse(
+        ano=ano,
+        trimestre=trimestre,
+        data=[
+            DistribuicaoUFPeriodo(
+                uf=item.uf,
+                total_despesas=item.total_despesas,
+                media_por_operadora=round(item.media_despesas, 2),
+                num_operadoras=item.num_operadoras,
+                num_registros_trimestrais=item.num_registros
+            )
+            for item in rows
+        ]
+    )
+
+
+@router.get("/analytics/acima-media", response_model=AcimaMediaResponse)
+async def acima_media(
+    limit: int = Query(10, ge=1, le=100, description="Quantidade de operadoras listadas"),
+    ano: Optional[int] = Query(None, ge=2000, le=2100),
+    trimestre: Optional[str] = Query(None, pattern=TRIMESTRE_PATTERN, description="1T a 4T"),
+    min_trimestres: int = Query(2, ge=1, description="Mínimo de trimestres acima da média"),
+    db: AsyncSession = Depends(get_db)
+):
+    trimestre = normalizar_trimestre(trimestre)
+    return await get_response_cache().get_or_compute(
+        "analytics_acima_media",
+        {"limit": limit, "ano": ano, "trimestre": trimestre, "min_trimestres": min_trimestres},
+        db,
+        lambda: _acima_media(db, limit, ano, trimestre, min_trimestres)
+    )
+
+
+async def _acima_media(
+    db: AsyncSession,
+    limit: int,
+    ano: Optional[int],
+    trimestre: Optional[str],
+    min_trimestres: int
+) -> AcimaMediaResponse:
+    ano_filtro, trimestre_filtro = _periodo(ano, trimestre)
+    periodo = await db.get(AnalyticsPeriodo, (ano_filtro, trimestre_filtro))
+    
+    filtro = (
+        AnalyticsAcimaMedia.ano == ano_filtro,
+        AnalyticsAcimaMedia.trimestre == trimestre_filtro,
+        AnalyticsAcimaMedia.trimestres_acima_media >= min_trimestres
+    )
+    total = await db.scalar(select(func.count()).select_from(AnalyticsAcimaMedia).where(*filtro))
+    rows = await db.scalars(
+        select(AnalyticsAcimaMedia).where(*filtro).order_by(
+            AnalyticsAcimaMedia.trimestres_acima_media.desc(),
+            AnalyticsAcimaMedia.cnpj
+        ).limit(limit)
+    )
+    
+    return AcimaMediaResponse(
+        ano=ano,
+        trimestre=trimestre,
+        min_trimestres=min_trimestres,
+        media_geral_despesas=round(periodo.media_despesas, 2) if periodo else Decimal(0),
+        total_operadoras=total or 0,
+        data=[
+            OperadoraAcimaMedia(
+                cnpj=item.cnpj,
+                razao_social=item.razao_social,
+                trimestres_acima_media=item.trimestres_acima_media
+            )
+            for item in rows
+        ]
+    )
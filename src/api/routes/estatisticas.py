@@ -1,8 +1,15 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
 from src.core.database import get_db
-from src.models.operadora import OperadoraCadastro, DespesaConsolidada, DespesaAgregada
+from src.core.cache import get_response_cache
+from src.models.operadora import (
+    OperadoraCadastro,
+    DespesaConsolidada,
+    EstatisticaGeral,
+    EstatisticaTopOperadora,
+    EstatisticaUF
+)
 from src.api.schemas import (
     EstatisticasResponse,
     EstatisticasGerais,
@@ -10,43 +17,61 @@ from src.api.schemas import (
     DistribuicaoUF
 )
 from decimal import Decimal
-from functools import lru_cache
-from datetime import datetime, timedelta
 
 router = APIRouter()
 
-_cache = {}
-_cache_ttl = timedelta(minutes=5)
-
 
-def get_cached_stats(db: Session):
-    cache_key = "estatisticas"
-    now = datetime.now()
+async def compute_estatisticas(db: AsyncSession) -> EstatisticasResponse:
+    gerais = await db.get(EstatisticaGeral, 1)
+    if gerais is None:
+        return await compute_estatisticas_live(db)
+    
+    top_operadoras = [
+        TopOperadora(
+            cnpj=item.cnpj,
+            razao_social=item.razao_social,
+            total_despesas=item.total_despesas,
+            uf=item.uf
+        )
+        for item in await db.scalars(select(EstatisticaTopOperadora).order_by(EstatisticaTopOperadora.posicao))
+    ]
     
-    if cache_key in _cache:
-        cached_data, cached_time = _cache[cache_key]
-        if now - cached_time < _cache_ttl:
-            return cached_data
+    distribuicao_uf = [
+        DistribuicaoUF(
+            uf=item.uf,
+            total_despesas=item.total_despesas,
+            num_operadoras=item.num_operadoras,
+            percentual=float(item.percentual)
+        )
+        for item in await db.scalars(select(EstatisticaUF).order_by(EstatisticaUF.total_despesas.desc()))
+    ]
     
-    stats = compute_estatisticas(db)
-    _cache[cache_key] = (stats, now)
-    return stats
+    return EstatisticasResponse(
+        gerais=EstatisticasGerais(
+            total_operadoras=gerais.total_operadoras,
+            total_despesas=gerais.total_despesas,
+            media_despesas=gerais.media_despesas,
+            total_registros=gerais.total_registros
+        ),
+        top_operadoras=top_operadoras,
+        distribuicao_uf=distribuicao_uf
+    )
 
 
-def compute_estatisticas(db: Session) -> EstatisticasResponse:
-    total_operadoras = db.query(func.count(OperadoraCadastro.id)).scalar() or 0
+async def compute_estatisticas_live(db: AsyncSession) -> EstatisticasResponse:
+    total_operadoras = await db.scalar(select(func.count(OperadoraCadastro.id))) or 0
     
-    despesas_stats = db.query(
+    despesas_stats = (await db.execute(select(
         func.sum(DespesaConsolidada.valor_despesas).label("total"),
         func.avg(DespesaConsolidada.valor_despesas).label("media"),
         func.count(DespesaConsolidada.id).label("count")
-    ).first()
+    ))).first()
     
     total_despesas = despesas_stats.total or Decimal(0)
     media_despesas = despesas_stats.media or Decimal(0)
     total_registros = despesas_stats.count or 0
     
-    top_5 = db.query(
+    top_5 = select(
         DespesaConsolidada.cnpj,
         DespesaConsolidada.razao_social,
         func.sum(DespesaConsolidada.valor_despesas).label("total")
@@ -55,21 +80,31 @@ def compute_estatisticas(db: Session) -> EstatisticasResponse:
         DespesaConsolidada.razao_social
     ).order_by(
         func.sum(DespesaConsolidada.valor_despesas).desc()
-    ).limit(5).all()
+    ).limit(5).subquery()
+    
+    top_rows = (await db.execute(select(
+        top_5.c.cnpj,
+        top_5.c.razao_social,
+        top_5.c.total,
+        OperadoraCadastro.uf
+    ).outerjoin(
+        OperadoraCadastro,
+        OperadoraCadastro.cnpj == top_5.c.cnpj
+    ).order_by(
+        top_5.c.total.desc()
+    ))).all()
     
-    top_operadoras = []
-    for item in top_5:
-        operadora = db.query(OperadoraCadastro).filter(
-            OperadoraCadastro.cnpj == item.cnpj
-        ).first()
-        top_operadoras.append(TopOperadora(
+    top_operadoras = [
+        TopOperadora(
             cnpj=item.cnpj,
             razao_social=item.razao_social,
             total_despesas=item.total,
-            uf=operadora.uf if operadora else None
-        ))
+            uf=item.uf
+        )
+        for item in top_rows
+    ]
     
-    distribuicao = db.query(
+    distribuicao = (await db.execute(select(
         OperadoraCadastro.uf,
         func.sum(DespesaConsolidada.valor_despesas).label("total"),
         func.count(func.distinct(DespesaConsolidada.cnpj)).label("num_ops")
@@ -82,7 +117,7 @@ def compute_estatisticas(db: Session) -> EstatisticasResponse:
         OperadoraCadastro.uf
     ).order_by(
         func.sum(DespesaConsolidada.valor_despesas).desc()
-    ).all()
+    ))).all()
     
     distribuicao_uf = []
     for item in distribuicao:
@@ -107,5 +142,10 @@ def compute_estatisticas(db: Session) -> EstatisticasResponse:
 
 
 @router.get("/estatisticas", response_model=EstatisticasResponse)
-def obter_estatisticas(db: Session = Depends(get_db)):
-    return get_cached_stats(db)
+async def obter_estatisticas(db: AsyncSession = Depends(get_db)):
+    return await get_response_cache().get_or_compute(
+        "estatisticas",
+        {},
+        db,
+        lambda: compute_estatisticas(db)
+    )
@@ -0,0 +1,148 @@
+import codecs
+import csv
+import io
+import zlib
+from typing import Optional
+from fastapi import APIRouter, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, exists, select
+from src.core.config import get_settings
+from src.core.database import AsyncSessionLocal
+from src.api.filters import TRIMESTRE_PATTERN, limpar_cnpj, normalizar_trimestre
+from src.api.responses import encode_json
+from src.models.operadora import OperadoraCadastro, DespesaConsolidada
+
+router = APIRouter()
+
+FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+FORMAT_PATTERN = f"^({'|'.join(FORMATS)})$"
+
+DESPESA_EXPORT_COLUMNS = (
+    DespesaConsolidada.id,
+    DespesaConsolidada.cnpj,
+    DespesaConsolidada.razao_social,
+    DespesaConsolidada.ano,
+    DespesaConsolidada.trimestre,
+    DespesaConsolidada.valor_despesas,
+)
+OPERADORA_EXPORT_COLUMNS = (
+    OperadoraCadastro.id,
+    OperadoraCadastro.cnpj,
+    OperadoraCadastro.razao_social,
+    OperadoraCadastro.registro_ans,
+    OperadoraCadastro.modalidade,
+    OperadoraCadastro.uf,
+)
+
+
+def _encode_csv(rows) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+def _encode_ndjson(fields, rows) -> bytes:
+    return b"".join(encode_json(dict(zip(fields, row))) + b"\n" for row in rows)
+
+
+async def _stream_rows(stmt: Select, formato: str, compactar: bool):
+    fields = [column.name for column in stmt.selected_columns]
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compactar else None
+    
+    def pack(chunk: bytes) -> bytes:
+        return compressor.compress(chunk) if compressor else chunk
+    
+    # Sessão própria: o gerador roda depois que a rota retorna, fora do ciclo de vida do get_db
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(stmt.execution_options(yield_per=get_settings().EXPORT_BATCH_ROWS))
+        
+        if formato == "csv":
+            # Mesmo encoding dos CSVs de data/processed (BOM para o Excel reconhecer UTF-8)
+            yield pack(codecs.BOM_UTF8 + _encode_csv([fields]))
+        
+        async for rows in result.partitions():
+            chunk = pack(_encode_csv(rows) if formato == "csv" else _encode_ndjson(fields, rows))
+            if chunk:
+                yield chunk
+    
+    if compressor:
+        yield compressor.flush()
+
+
+def _export_response(stmt: Select, nome: str, formato: str, compactar: bool) -> StreamingResponse:
+    filename = f"{nome}.{formato}"
+    media_type = FORMATS[formato]
+    headers = {}
+    if compactar:
+        filename += ".gz"
+        media_type = "application/gzip"
+        # O arquivo já é o .gz: com Content-Encoding definido o GZipMiddleware não compacta de novo
+        headers["Content-Encoding"] = "identity"
+    headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    
+    return StreamingResponse(
+        _stream_rows(stmt, formato, compactar),
+        media_type=media_type,
+        headers=headers
+    )
+
+
+@router.get("/export/despesas")
+async def exportar_despesas(
+    formato: str = Query("csv", pattern=FORMAT_PATTERN, description="csv ou ndjson"),
+    gzip: bool = Query(False, description="Compacta o arquivo (.gz)"),
+    uf: Optional[str] = Query(None, description="Filtrar por UF da operadora"),
+    ano: Optional[int] = Query(None, ge=2000, le=2100),
+    trimestre: Optional[str] = Query(None, pattern=TRIMESTRE_PATTERN, description="1T a 4T"),
+    cnpj: Optional[str] = Query(None)
+):
+    stmt = select(*DESPESA_EXPORT_COLUMNS)
+    
+    cnpj_limpo = limpar_cnpj(cnpj) if cnpj else None
+    if cnpj_limpo:
+        stmt = stmt.where(DespesaConsolidada.cnpj == cnpj_limpo)
+    if ano is not None:
+        stmt = stmt.where(DespesaConsolidada.ano == ano)
+    trimestre = normalizar_trimestre(trimestre)
+    if trimestre:
+        stmt = stmt.where(DespesaConsolidada.trimestre == trimestre)
+    if uf:
+        stmt = stmt.where(
+            DespesaConsolidada.cnpj.in_(
+                select(OperadoraCadastro.cnpj).where(OperadoraCadastro.uf == uf.strip().upper())
+            )
+        )
+    
+    return _export_response(stmt.order_by(DespesaConsolidada.id), "despesas", formato, gzip)
+
+
+@router.get("/export/operadoras")
+async def exportar_operadoras(
+    formato: str = Query("csv", pattern=FORMAT_PATTERN, description="csv ou ndjson"),
+    gzip: bool = Query(False, description="Compacta o arquivo (.gz)"),
+    uf: Optional[str] = Query(None, description="Filtrar por UF"),
+    ano: Optional[int] = Query(None, ge=2000, le=2100, description="Somente operadoras com despesas no ano"),
+    trimestre: Optional[str] = Query(None, pattern=TRIMESTRE_PATTERN, description="Somente operadoras com despesas no trimestre (1T a 4T)"),
+    cnpj: Optional[str] = Query(None)
+):
+    stmt = select(*OPERADORA_EXPORT_COLUMNS)
+    
+    cnpj_limpo = limpar_cnpj(cnpj) if cnpj else None
+    if cnpj_limpo:
+        stmt = stmt.where(OperadoraCadastro.cnpj == cnpj_limpo)
+    if uf:
+        stmt = stmt.where(OperadoraCadastro.uf == uf.strip().upper())
+    
+    trimestre = normalizar_trimestre(trimestre)
+    if ano is not None or trimestre:
+        periodo = select(DespesaConsolidada.id).where(DespesaConsolidada.cnpj == OperadoraCadastro.cnpj)
+        if ano is not None:
+            periodo = periodo.where(DespesaConsolidada.ano == ano)
+        if trimestre:
+            periodo = periodo.where(DespesaConsolidada.trimestre == trimestre)
+        stmt = stmt.where(exists(periodo))
+    
+    return _export_response(stmt.order_by(OperadoraCadastro.id), "operadoras", formato, gzip)
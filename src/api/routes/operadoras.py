@@ -1,124 +1,259 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import String, any_, bindparam, func, select, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY
 from typing import Optional
+from decimal import Decimal
+from src.core.config import get_settings
 from src.core.database import get_db
+from src.core.cache import get_response_cache
+from src.api.filters import limpar_cnpj
+from src.api.search import get_operadora_search
+from src.api.pagination import TOTAL_MODES, encode_cursor, decode_cursor, count_total, page_count
+from src.api.responses import encode_json, json_bytes_response
 from src.models.operadora import OperadoraCadastro, DespesaConsolidada
 from src.api.schemas import (
-    PaginatedResponse, 
-    OperadoraResponse, 
+    PaginatedResponse,
     OperadoraDetalhe,
-    DespesaResponse,
+    OperadoraBatchRequest,
+    OperadoraBatchResponse,
     DespesasPaginatedResponse
 )
-import math
 
 router = APIRouter()
 
+TOTAL_PATTERN = f"^({'|'.join(TOTAL_MODES)})$"
+
+# Colunas na mesma ordem dos campos de OperadoraResponse / DespesaResponse: as linhas viram dicts
+# direto, sem objetos ORM nem validação Pydantic por linha
+OPERADORA_COLUMNS = (
+    OperadoraCadastro.cnpj,
+    OperadoraCadastro.razao_social,
+    OperadoraCadastro.registro_ans,
+    OperadoraCadastro.modalidade,
+    OperadoraCadastro.uf,
+    OperadoraCadastro.id,
+)
+OPERADORA_FIELDS = tuple(column.key for column in OPERADORA_COLUMNS)
+DESPESA_COLUMNS = (
+    DespesaConsolidada.trimestre,
+    DespesaConsolidada.ano,
+    DespesaConsolidada.valor_despesas,
+    DespesaConsolidada.id,
+    DespesaConsolidada.cnpj,
+    DespesaConsolidada.razao_social,
+)
+DESPESA_FIELDS = tuple(column.key for column in DESPESA_COLUMNS)
+
+
+def _detalhe_select():
+    return select(
+        *OPERADORA_COLUMNS,
+        func.sum(DespesaConsolidada.valor_despesas).label("total_despesas"),
+        func.count(DespesaConsolidada.id).label("num_trimestres")
+    ).outerjoin(
+        DespesaConsolidada,
+        DespesaConsolidada.cnpj == OperadoraCadastro.cnpj
+    ).group_by(
+        OperadoraCadastro.id
+    )
+
+
+def _detalhe_dict(row) -> dict:
+    detalhe = dict(zip(OPERADORA_FIELDS, row))
+    detalhe["total_despesas"] = row.total_despesas or Decimal(0)
+    detalhe["num_trimestres"] = row.num_trimestres or 0
+    return detalhe
+
 
 @router.get("/operadoras", response_model=PaginatedResponse)
-def listar_operadoras(
+async def listar_operadoras(
     page: int = Query(1, ge=1, description="Número da página"),
     limit: int = Query(10, ge=1, le=100, description="Itens por página"),
-    search: Optional[str] = Query(None, description="Busca por razão social ou CNPJ"),
+    search: Optional[str] = Query(None, description="Busca por razão social (sem acentos, tolera erros de digitação) ou prefixo do CNPJ; resultados ordenados por relevância, só com page/limit"),
     uf: Optional[str] = Query(None, description="Filtrar por UF"),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Paginação por cursor: vazio na primeira página, depois o next_cursor da resposta"),
+    total: Optional[str] = Query(None, pattern=TOTAL_PATTERN, description="exact, estimated ou none (padrão: exact por página, none por cursor)"),
+    db: AsyncSession = Depends(get_db)
 ):
-    query = db.query(OperadoraCadastro)
+    search = search.strip() if search else None
+    uf = uf.strip().upper() if uf else None
+    if search and cursor is not None:
+        # O keyset segue razao_social/id e ignoraria a ordem por relevância da busca
+        raise HTTPException(status_code=400, detail="Paginação por cursor não suporta busca; use page/limit")
+    total_mode = total or ("none" if cursor is not None else "exact")
+    body = await get_response_cache().get_or_compute(
+        "operadoras",
+        {"page": page, "limit": limit, "search": search, "uf": uf, "cursor": cursor, "total": total_mode},
+        db,
+        lambda: _listar_operadoras(db, page, limit, search, uf, cursor, total_mode)
+    )
+    return json_bytes_response(body)
+
+
+async def _listar_operadoras(
+    db: AsyncSession,
+    page: int,
+    limit: int,
+    search: Optional[str],
+    uf: Optional[str],
+    cursor: Optional[str],
+    total_mode: str
+) -> bytes:
+    stmt = select(*OPERADORA_COLUMNS)
+    ranking = []
     
     if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            or_(
-                OperadoraCadastro.razao_social.ilike(search_term),
-                OperadoraCadastro.cnpj.like(search_term)
-            )
-        )
+        stmt, ranking = await get_operadora_search().apply(db, stmt, search)
     
     if uf:
-        query = query.filter(OperadoraCadastro.uf == uf.upper())
+        stmt = stmt.where(OperadoraCadastro.uf == uf)
     
-    total = query.count()
-    pages = math.ceil(total / limit) if total > 0 else 1
+    total = await count_total(db, stmt, total_mode)
     
-    offset = (page - 1) * limit
-    operadoras = query.order_by(OperadoraCadastro.razao_social).offset(offset).limit(limit).all()
+    if cursor is None:
+        ordered = stmt.order_by(*ranking, OperadoraCadastro.razao_social, OperadoraCadastro.id)
+        operadoras = (await db.execute(ordered.offset((page - 1) * limit).limit(limit))).all()
+        next_cursor = None
+    else:
+        ordered = stmt.order_by(OperadoraCadastro.razao_social, OperadoraCadastro.id)
+        after = decode_cursor(cursor, (str, int))
+        if after:
+            ordered = ordered.where(
+                tuple_(OperadoraCadastro.razao_social, OperadoraCadastro.id) > tuple_(*after)
+            )
+        operadoras = (await db.execute(ordered.limit(limit + 1))).all()
+        next_cursor = None
+        if len(operadoras) > limit:
+            operadoras = operadoras[:limit]
+            last = operadoras[-1]
+            next_cursor = encode_cursor([last.razao_social, last.id])
+        page = None
     
-    return PaginatedResponse(
-        data=[OperadoraResponse.model_validate(op) for op in operadoras],
-        total=total,
-        page=page,
-        limit=limit,
-        pages=pages
-    )
+    return encode_json({
+        "data": [dict(zip(OPERADORA_FIELDS, row)) for row in operadoras],
+        "total": total,
+        "page": page,
+        "limit": limit,
+        "pages": page_count(total, limit),
+        "total_estimado": total_mode == "estimated",
+        "next_cursor": next_cursor,
+    })
 
 
 @router.get("/operadoras/{cnpj}", response_model=OperadoraDetalhe)
-def obter_operadora(cnpj: str, db: Session = Depends(get_db)):
-    cnpj_limpo = cnpj.replace(".", "").replace("/", "").replace("-", "")
-    
-    operadora = db.query(OperadoraCadastro).filter(
-        OperadoraCadastro.cnpj == cnpj_limpo
-    ).first()
+async def obter_operadora(cnpj: str, db: AsyncSession = Depends(get_db)):
+    cnpj_limpo = limpar_cnpj(cnpj)
+    body = await get_response_cache().get_or_compute(
+        "operadora",
+        {"cnpj": cnpj_limpo},
+        db,
+        lambda: _obter_operadora(db, cnpj_limpo)
+    )
+    return json_bytes_response(body)
+
+
+async def _obter_operadora(db: AsyncSession, cnpj_limpo: str) -> bytes:
+    row = (await db.execute(
+        _detalhe_select().where(OperadoraCadastro.cnpj == cnpj_limpo).limit(1)
+    )).first()
     
-    if not operadora:
+    if row is None:
         raise HTTPException(status_code=404, detail="Operadora não encontrada")
     
-    despesas_stats = db.query(
-        func.sum(DespesaConsolidada.valor_despesas).label("total"),
-        func.count(DespesaConsolidada.id).label("num_trimestres")
-    ).filter(DespesaConsolidada.cnpj == cnpj_limpo).first()
+    return encode_json(_detalhe_dict(row))
+
+
+@router.post("/operadoras/batch", response_model=OperadoraBatchResponse)
+async def obter_operadoras_batch(payload: OperadoraBatchRequest, db: AsyncSession = Depends(get_db)):
+    max_cnpjs = get_settings().API_BATCH_MAX_CNPJS
+    if len(payload.cnpjs) > max_cnpjs:
+        raise HTTPException(status_code=422, detail=f"Máximo de {max_cnpjs} CNPJs por requisição")
     
-    return OperadoraDetalhe(
-        id=operadora.id,
-        cnpj=operadora.cnpj,
-        razao_social=operadora.razao_social,
-        registro_ans=operadora.registro_ans,
-        modalidade=operadora.modalidade,
-        uf=operadora.uf,
-        total_despesas=despesas_stats.total if despesas_stats.total else 0,
-        num_trimestres=despesas_stats.num_trimestres if despesas_stats.num_trimestres else 0
-    )
+    # Normaliza como obter_operadora e remove repetidos mantendo a ordem de entrada
+    cnpjs = list(dict.fromkeys(limpar_cnpj(cnpj) for cnpj in payload.cnpjs))
+    
+    # Uma única query para todos: cadastro + SUM/COUNT das despesas, agrupados por operadora
+    rows = (await db.execute(
+        _detalhe_select().where(
+            OperadoraCadastro.cnpj == any_(bindparam("cnpjs", cnpjs, type_=ARRAY(String)))
+        )
+    )).all()
+    
+    encontrados = {row.cnpj: _detalhe_dict(row) for row in rows}
+    return json_bytes_response(encode_json({
+        "data": {cnpj: encontrados[cnpj] for cnpj in cnpjs if cnpj in encontrados},
+        "nao_encontrados": [cnpj for cnpj in cnpjs if cnpj not in encontrados],
+    }))
 
 
 @router.get("/operadoras/{cnpj}/despesas", response_model=DespesasPaginatedResponse)
-def obter_despesas_operadora(
+async def obter_despesas_operadora(
     cnpj: str,
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Paginação por cursor: vazio na primeira página, depois o next_cursor da resposta"),
+    total: Optional[str] = Query(None, pattern=TOTAL_PATTERN, description="exact, estimated ou none (padrão: exact por página, none por cursor)"),
+    db: AsyncSession = Depends(get_db)
 ):
-    cnpj_limpo = cnpj.replace(".", "").replace("/", "").replace("-", "")
-    
-    operadora = db.query(OperadoraCadastro).filter(
-        OperadoraCadastro.cnpj == cnpj_limpo
-    ).first()
+    cnpj_limpo = limpar_cnpj(cnpj)
+    total_mode = total or ("none" if cursor is not None else "exact")
+    body = await get_response_cache().get_or_compute(
+        "operadora_despesas",
+        {"cnpj": cnpj_limpo, "page": page, "limit": limit, "cursor": cursor, "total": total_mode},
+        db,
+        lambda: _obter_despesas_operadora(db, cnpj_limpo, page, limit, cursor, total_mode)
+    )
+    return json_bytes_response(body)
+
+
+async def _obter_despesas_operadora(
+    db: AsyncSession,
+    cnpj_limpo: str,
+    page: int,
+    limit: int,
+    cursor: Optional[str],
+    total_mode: str
+) -> bytes:
+    operadora_id = await db.scalar(
+        select(OperadoraCadastro.id).where(OperadoraCadastro.cnpj == cnpj_limpo).limit(1)
+    )
     
-    if not operadora:
+    if operadora_id is None:
         raise HTTPException(status_code=404, detail="Operadora não encontrada")
     
-    query = db.query(DespesaConsolidada).filter(DespesaConsolidada.cnpj == cnpj_limpo)
-    
-    total = query.count()
-    pages = math.ceil(total / limit) if total > 0 else 1
+    stmt = select(*DESPESA_COLUMNS).where(DespesaConsolidada.cnpj == cnpj_limpo)
     
-    offset = (page - 1) * limit
-    despesas = query.order_by(
+    total = await count_total(db, stmt, total_mode)
+    ordered = stmt.order_by(
         DespesaConsolidada.ano.desc(),
-        DespesaConsolidada.trimestre.desc()
-    ).offset(offset).limit(limit).all()
-    
-    return DespesasPaginatedResponse(
-        data=[DespesaResponse(
-            id=d.id,
-            cnpj=d.cnpj,
-            razao_social=d.razao_social,
-            trimestre=d.trimestre,
-            ano=d.ano,
-            valor_despesas=d.valor_despesas
-        ) for d in despesas],
-        total=total,
-        page=page,
-        limit=limit,
-        pages=pages
+        DespesaConsolidada.trimestre.desc(),
+        DespesaConsolidada.id.desc()
     )
+    
+    if cursor is None:
+        despesas = (await db.execute(ordered.offset((page - 1) * limit).limit(limit))).all()
+        next_cursor = None
+    else:
+        before = decode_cursor(cursor, (int, str, int))
+        if before:
+            ordered = ordered.where(
+                tuple_(DespesaConsolidada.ano, DespesaConsolidada.trimestre, DespesaConsolidada.id) < tuple_(*before)
+            )
+        despesas = (await db.execute(ordered.limit(limit + 1))).all()
+        next_cursor = None
+        if len(despesas) > limit:
+            despesas = despesas[:limit]
+            last = despesas[-1]
+            next_cursor = encode_cursor([last.ano, last.trimestre, last.id])
+        page = None
+    
+    return encode_json({
+        "data": [dict(zip(DESPESA_FIELDS, row)) for row in despesas],
+        "total": total,
+        "page": page,
+        "limit": limit,
+        "pages": page_count(total, limit),
+        "total_estimado": total_mode == "estimated",
+        "next_cursor": next_cursor,
+    })
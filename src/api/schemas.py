@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
 from decimal import Decimal
 
 
@@ -39,20 +39,33 @@ class OperadoraDetalhe(OperadoraBase):
     num_trimestres: Optional[int] = None
 
 
+class OperadoraBatchRequest(BaseModel):
+    cnpjs: List[str] = Field(..., min_length=1)
+
+
+class OperadoraBatchResponse(BaseModel):
+    data: Dict[str, OperadoraDetalhe]
+    nao_encontrados: List[str]
+
+
 class PaginatedResponse(BaseModel):
     data: List[OperadoraResponse]
-    total: int
-    page: int
+    total: Optional[int] = None
+    page: Optional[int] = None
     limit: int
-    pages: int
+    pages: Optional[int] = None
+    total_estimado: bool = False
+    next_cursor: Optional[str] = None
 
 
 class DespesasPaginatedResponse(BaseModel):
     data: List[DespesaResponse]
-    total: int
-    page: int
+    total: Optional[int] = None
+    page: Optional[int] = None
     limit: int
-    pages: int
+    pages: Optional[int] = None
+    total_estimado: bool = False
+    next_cursor: Optional[str] = None
 
 
 class EstatisticasGerais(BaseModel):
@@ -80,3 +93,49 @@ class EstatisticasResponse(BaseModel):
     gerais: EstatisticasGerais
     top_operadoras: List[TopOperadora]
     distribuicao_uf: List[DistribuicaoUF]
+
+
+class CrescimentoOperadora(BaseModel):
+    cnpj: str
+    razao_social: str
+    primeiro_periodo: str
+    ultimo_periodo: str
+    despesa_inicial: Decimal
+    despesa_final: Decimal
+    crescimento_percentual: Decimal
+    num_trimestres: int
+
+
+class CrescimentoResponse(BaseModel):
+    ano: Optional[int] = None
+    min_trimestres: int
+    data: List[CrescimentoOperadora]
+
+
+class DistribuicaoUFPeriodo(BaseModel):
+    uf: str
+    total_despesas: Decimal
+    media_por_operadora: Decimal
+    num_operadoras: int
+    num_registros_trimestrais: int
+
+
+class DistribuicaoUFResponse(BaseModel):
+    ano: Optional[int] = None
+    trimestre: Optional[str] = None
+    data: List[DistribuicaoUFPeriodo]
+
+
+class OperadoraAcimaMedia(BaseModel):
+    cnpj: str
+    razao_social: str
+    trimestres_acima_media: int
+
+
+class AcimaMediaResponse(BaseModel):
+    ano: Optional[int] = None
+    trimestre: Optional[str] = None
+    min_trimestres: int
+    media_geral_despesas: Decimal
+    total_operadoras: int
+    data: List[OperadoraAcimaMedia]
@@ -0,0 +1,215 @@
+import asyncio
+import bisect
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import Select, case, false, func, or_, select, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.cache import get_response_cache
+from src.core.config import get_settings
+from src.models.operadora import ACENTOS, SEM_ACENTOS, OperadoraCadastro
+
+SIMILARITY_THRESHOLD = 0.3
+TRIGRAM_INDEX = "idx_cadastro_razao_social_trgm"
+CNPJ_PUNCTUATION = re.compile(r"[.\-/\s]")
+NON_WORD = re.compile(r"[^0-9a-z]+")
+TRIGRAM_INDEX_QUERY = text("SELECT 1 FROM pg_indexes WHERE indexname = :name")
+INDEX_ROWS = select(OperadoraCadastro.id, OperadoraCadastro.razao_social, OperadoraCadastro.cnpj)
+
+_translation = str.maketrans(ACENTOS, SEM_ACENTOS)
+
+
+def normalize_text(value: str) -> str:
+    return value.lower().translate(_translation)
+
+
+def cnpj_digits(term: str) -> Optional[str]:
+    digits = CNPJ_PUNCTUATION.sub("", term)
+    return digits if digits.isdigit() else None
+
+
+def trigrams(value: str) -> Set[str]:
+    # Mesmo recorte do pg_trgm: cada palavra com dois espaços antes e um depois
+    grams = set()
+    for word in NON_WORD.split(normalize_text(value)):
+        if not word:
+            continue
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def inner_trigrams(needle: str) -> Set[str]:
+    grams = set()
+    for word in NON_WORD.split(needle):
+        grams.update(word[i:i + 3] for i in range(len(word) - 2))
+    return grams
+
+
+class NGramIndex:
+    def __init__(self, rows: List[Tuple[int, str, str]]):
+        postings: Dict[str, List[int]] = defaultdict(list)
+        names, sizes = [], []
+        for position, (_, razao_social, _) in enumerate(rows):
+            grams = trigrams(razao_social or "")
+            for gram in grams:
+                postings[gram].append(position)
+            names.append(normalize_text(razao_social or ""))
+            sizes.append(len(grams))
+        self.ids = np.array([row[0] for row in rows], dtype=np.int64)
+        self.names = names
+        self.sizes = np.array(sizes, dtype=np.float64)
+        self.name_order = np.argsort(np.argsort(np.array(names, dtype=object), kind="stable"), kind="stable")
+        self.postings = {gram: np.array(items, dtype=np.int32) for gram, items in postings.items()}
+        cnpjs = sorted((row[2] or "", position) for position, row in enumerate(rows))
+        self.cnpjs = [cnpj for cnpj, _ in cnpjs]
+        self.cnpj_positions = np.array([position for _, position in cnpjs], dtype=np.int64)
+    
+    def __len__(self):
+        return len(self.names)
+    
+    def _cnpj_prefix(self, digits: str) -> np.ndarray:
+        start = bisect.bisect_left(self.cnpjs, digits)
+        end = bisect.bisect_left(self.cnpjs, digits + "\x7f")
+        return self.cnpj_positions[start:end]
+    
+    def _count(self, grams: Set[str], size: int) -> np.ndarray:
+        arrays = [self.postings[gram] for gram in grams if gram in self.postings]
+        if not arrays:
+            return np.zeros(size, dtype=np.float64)
+        return np.bincount(np.concatenate(arrays), minlength=size).astype(np.float64)
+    
+    def search(self, term: str, limit: Optional[int] = None) -> List[int]:
+        size = len(self.names)
+        scores = np.zeros(size, dtype=np.float64)
+        digits = cnpj_digits(term)
+        if digits:
+            scores[self._cnpj_prefix(digits)] = 3.0
+        
+        needle = normalize_text(term).strip()
+        if needle:
+            query_grams = trigrams(term)
+            shared = self._count(query_grams, size)
+            # Similaridade no estilo pg_trgm: trigramas em comum / trigramas na união
+            similarity = shared / np.maximum(len(query_grams) + self.sizes - shared, 1)
+            text_scores = np.where(similarity >= SIMILARITY_THRESHOLD, similarity, 0.0)
+            
+            # Substring: só confere quem tem todos os trigramas internos do termo
+            required = inner_trigrams(needle)
+            if required:
+                candidates = np.flatnonzero(self._count(required, size) == len(required))
+            else:
+                candidates = np.arange(size)
+            contains = candidates[np.fromiter(
+                (needle in self.names[position] for position in candidates),
+                dtype=bool,
+                count=len(candidates)
+            )]
+            text_scores[contains] = 1.0 + similarity[contains]
+            scores = np.maximum(scores, text_scores)
+        
+        matches = np.flatnonzero(scores)
+        order = np.lexsort((self.ids[matches], self.name_order[matches], -scores[matches]))[:limit]
+        return self.ids[matches[order]].tolist()
+
+
+@dataclass(frozen=True)
+class SearchState:
+    version: int
+    trigram: bool
+    index: Optional[NGramIndex]
+    
+    def describe(self) -> str:
+        return "pg_trgm" if self.trigram else f"n-gram em memória ({len(self.index)} operadoras)"
+
+
+class OperadoraSearch:
+    def __init__(self, max_results: Optional[int] = None):
+        self.max_results = max_results or get_settings().SEARCH_MAX_RESULTS
+        # Trocado por inteiro (uma atribuição): quem leu o estado anterior continua com versão, modo e índice coerentes
+        self._state: Optional[SearchState] = None
+        self._loading: Optional[int] = None
+        self._lock = asyncio.Lock()
+    
+    def _is_current(self, state: Optional[SearchState], version: int) -> bool:
+        return state is not None and (state.version == version or self._loading == version)
+    
+    async def _refresh(self, db: AsyncSession) -> SearchState:
+        version = await get_response_cache().data_version(db)
+        if self._is_current(self._state, version):
+            return self._state
+        
+        async with self._lock:
+            if self._is_current(self._state, version):
+                return self._state
+            self._loading = version
+            try:
+                trigram = await self._has_trigram_index(db)
+                rows = None if trigram else (await db.execute(INDEX_ROWS)).all()
+            except BaseException:
+                self._loading = None
+                raise
+        
+        # Montagem fora do lock e do event loop; enquanto isso as outras requisições usam o estado anterior
+        try:
+            index = None if trigram else await asyncio.to_thread(NGramIndex, rows)
+        finally:
+            self._loading = None
+        self._state = SearchState(version, trigram, index)
+        return self._state
+    
+    async def _has_trigram_index(self, db: AsyncSession) -> bool:
+        if db.get_bind().dialect.name != "postgresql":
+            return False
+        try:
+            return (await db.execute(TRIGRAM_INDEX_QUERY, {"name": TRIGRAM_INDEX})).first() is not None
+        except SQLAlchemyError:
+            await db.rollback()
+            return False
+    
+    async def warm(self, db: AsyncSession) -> str:
+        return (await self._refresh(db)).describe()
+    
+    async def apply(self, db: AsyncSession, stmt: Select, term: str) -> Tuple[Select, list]:
+        return self._filter(await self._refresh(db), stmt, term)
+    
+    def _filter(self, state: SearchState, query, term: str):
+        if state.trigram:
+            return self._apply_trigram(query, term)
+        return self._apply_index(state.index, query, term)
+    
+    def _apply_trigram(self, query: Select, term: str) -> Tuple[Select, list]:
+        needle = normalize_text(term)
+        busca = OperadoraCadastro.razao_social_busca
+        conditions = [busca.contains(needle, autoescape=True), busca.op("%")(needle)]
+        ranking = []
+        digits = cnpj_digits(term)
+        if digits:
+            prefix = OperadoraCadastro.cnpj.startswith(digits)
+            conditions.append(prefix)
+            ranking.append(case((prefix, 0), else_=1))
+        ranking.append(case((busca.contains(needle, autoescape=True), 0), else_=1))
+        ranking.append(func.similarity(busca, needle).desc())
+        return query.filter(or_(*conditions)), ranking
+    
+    def _apply_index(self, index: NGramIndex, query: Select, term: str) -> Tuple[Select, list]:
+        # Só os max_results mais relevantes viram IN (...) e CASE na query; termos genéricos casariam o cadastro inteiro
+        ids = index.search(term, self.max_results)
+        if not ids:
+            return query.filter(false()), []
+        ranks = {row_id: position for position, row_id in enumerate(ids)}
+        return (
+            query.filter(OperadoraCadastro.id.in_(ids)),
+            [case(ranks, value=OperadoraCadastro.id, else_=len(ids))]
+        )
+
+
+@lru_cache()
+def get_operadora_search() -> OperadoraSearch:
+    return OperadoraSearch()
@@ -0,0 +1,290 @@
+import asyncio
+import hashlib
+import json
+import pickle
+import random
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import get_settings
+
+MISSING = object()
+TTL_JITTER = 0.1
+DATA_VERSION_QUERY = text("SELECT versao FROM data_version WHERE id = 1")
+
+
+class CacheBackend(ABC):
+    # Backends com I/O bloqueante rodam fora do event loop (asyncio.to_thread) no ResponseCache
+    blocking = False
+    
+    @abstractmethod
+    def get(self, key: str) -> Any:
+        ...
+    
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: float):
+        ...
+    
+    @abstractmethod
+    def clear(self):
+        ...
+    
+    def acquire_lease(self, key: str, ttl: float) -> bool:
+        return True
+    
+    def release_lease(self, key: str):
+        pass
+
+
+class NullCache(CacheBackend):
+    def get(self, key: str) -> Any:
+        return MISSING
+    
+    def set(self, key: str, value: Any, ttl: float):
+        pass
+    
+    def clear(self):
+        pass
+
+
+class MemoryCache(CacheBackend):
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key: str, value: Any, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self):
+        return len(self._entries)
+
+
+# Compartilhado entre os workers do uvicorn no mesmo host; faz o papel de um Redis em ambiente local
+class SQLiteCache(CacheBackend):
+    blocking = True
+    
+    def __init__(self, path: str, max_entries: int = 10_000):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS leases (
+                    key TEXT PRIMARY KEY,
+                    expires_at REAL NOT NULL
+                )
+            """)
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+    
+    def get(self, key: str) -> Any:
+        row = self._connect().execute(
+            "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or row[1] <= time.time():
+            return MISSING
+        return pickle.loads(row[0])
+    
+    def set(self, key: str, value: Any, ttl: float):
+        conn = self._connect()
+        now = time.time()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), now + ttl)
+        )
+        if random.random() < 0.05:
+            conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+            conn.execute("""
+                DELETE FROM cache WHERE key IN (
+                    SELECT key FROM cache ORDER BY expires_at DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+    
+    def clear(self):
+        conn = self._connect()
+        conn.execute("DELETE FROM cache")
+        conn.execute("DELETE FROM leases")
+    
+    def acquire_lease(self, key: str, ttl: float) -> bool:
+        conn = self._connect()
+        now = time.time()
+        conn.execute("DELETE FROM leases WHERE key = ? AND expires_at <= ?", (key, now))
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO leases (key, expires_at) VALUES (?, ?)", (key, now + ttl)
+        )
+        return cursor.rowcount == 1
+    
+    def release_lease(self, key: str):
+        self._connect().execute("DELETE FROM leases WHERE key = ?", (key,))
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        backend: CacheBackend,
+        ttl: float = 300,
+        version_check_interval: float = 5,
+        lease_timeout: float = 10,
+    ):
+        self.backend = backend
+        self.ttl = ttl
+        self.version_check_interval = version_check_interval
+        self.lease_timeout = lease_timeout
+        self._version: Optional[int] = None
+        self._version_checked_at = 0.0
+        self._locks: Dict[str, asyncio.Lock] = {}
+    
+    @staticmethod
+    def normalize_params(params: Dict[str, Any]) -> str:
+        normalized = {}
+        for name, value in params.items():
+            if isinstance(value, str):
+                value = value.strip()
+            if value is None or value == "":
+                continue
+            normalized[name] = value
+        return json.dumps(normalized, sort_keys=True, default=str, ensure_ascii=False)
+    
+    def make_key(self, namespace: str, params: Dict[str, Any], version: int) -> str:
+        digest = hashlib.sha1(self.normalize_params(params).encode("utf-8")).hexdigest()
+        return f"{namespace}:v{version}:{digest}"
+    
+    # A carga (src/etl/loader.py) incrementa data_version no banco; as chaves mudam de versão em até
+    # version_check_interval segundos em todos os workers, sem invalidação explícita do backend
+    def _cached_version(self) -> Optional[int]:
+        if self._version is not None and time.monotonic() - self._version_checked_at < self.version_check_interval:
+            return self._version
+        return None
+    
+    def _store_version(self, version: Optional[int]) -> int:
+        self._version = version or 0
+        self._version_checked_at = time.monotonic()
+        return self._version
+    
+    async def data_version(self, db: AsyncSession) -> int:
+        cached = self._cached_version()
+        if cached is not None:
+            return cached
+        try:
+            version = (await db.execute(DATA_VERSION_QUERY)).scalar()
+        except SQLAlchemyError:
+            await db.rollback()
+            version = None
+        return self._store_version(version)
+    
+    def _jittered_ttl(self) -> float:
+        return self.ttl * random.uniform(1 - TTL_JITTER, 1 + TTL_JITTER)
+    
+    async def _call(self, method: Callable, *args) -> Any:
+        if self.backend.blocking:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+    
+    async def get_or_compute(
+        self,
+        namespace: str,
+        params: Dict[str, Any],
+        db: AsyncSession,
+        compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        # Sem cache não há o que compartilhar: nem consulta de versão nem lock por chave
+        if isinstance(self.backend, NullCache):
+            return await compute()
+        
+        key = self.make_key(namespace, params, await self.data_version(db))
+        
+        value = await self._call(self.backend.get, key)
+        if value is not MISSING:
+            return value
+        
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            value = await self._call(self.backend.get, key)
+            if value is not MISSING:
+                return value
+            
+            leased = await self._call(self.backend.acquire_lease, key, self.lease_timeout)
+            if not leased:
+                deadline = time.monotonic() + self.lease_timeout
+                while time.monotonic() < deadline:
+                    await asyncio.sleep(0.05)
+                    value = await self._call(self.backend.get, key)
+                    if value is not MISSING:
+                        return value
+            
+            try:
+                value = await compute()
+                await self._call(self.backend.set, key, value, self._jittered_ttl())
+            finally:
+                if leased:
+                    await self._call(self.backend.release_lease, key)
+                if self._locks.get(key) is lock:
+                    del self._locks[key]
+            return value
+
+
+def create_backend(kind: str) -> CacheBackend:
+    settings = get_settings()
+    if kind == "none":
+        return NullCache()
+    if kind == "memory":
+        return MemoryCache(settings.CACHE_MAX_ENTRIES)
+    if kind == "sqlite":
+        return SQLiteCache(settings.CACHE_SQLITE_PATH, settings.CACHE_MAX_ENTRIES)
+    raise ValueError(f"Backend de cache inválido: {kind}")
+
+
+@lru_cache()
+def get_response_cache() -> ResponseCache:
+    settings = get_settings()
+    return ResponseCache(
+        create_backend(settings.CACHE_BACKEND),
+        ttl=settings.CACHE_TTL_SECONDS,
+        version_check_interval=settings.CACHE_VERSION_CHECK_SECONDS,
+    )
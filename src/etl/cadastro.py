@@ -0,0 +1,114 @@
+import json
+import pandas as pd
+import requests
+from pathlib import Path
+from bs4 import BeautifulSoup
+from typing import Dict, Optional
+from src.core.config import get_settings
+from src.etl.downloader import ans_url, create_session
+from src.etl.schema import cnpj_to_int
+from src.etl.validator import normalize_cnpj_array
+
+settings = get_settings()
+
+class CadastroProvider:
+    def __init__(self, cache_dir: str = "data/downloads", base_url: Optional[str] = None, session: Optional[requests.Session] = None):
+        self.base_url = (base_url or settings.ANS_CADASTRO_URL or ans_url("operadoras_de_plano_de_saude_ativas")).rstrip('/') + '/'
+        self.cache_dir = Path(cache_dir) / "cadastro"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.csv_path = self.cache_dir / "operadoras_ativas.csv"
+        self.meta_path = self.cache_dir / "operadoras_ativas.meta.json"
+        self.session = session or create_session()
+        self._cadastro = None
+    
+    def _read_meta(self) -> Dict:
+        if not self.meta_path.exists():
+            return {}
+        try:
+            return json.loads(self.meta_path.read_text(encoding='utf-8'))
+        except (ValueError, OSError):
+            return {}
+    
+    def _find_csv_link(self) -> Optional[str]:
+        response = self.session.get(self.base_url, timeout=30)
+        response.raise_for_status()
+        soup = BeautifulSoup(response.content, 'html.parser')
+        
+        for link in soup.find_all('a', href=True):
+            if '.csv' in link['href'].lower():
+                return self.base_url + link['href']
+        return None
+    
+    def fetch(self) -> Path:
+        try:
+            csv_link = self._find_csv_link()
+        except requests.RequestException as e:
+            if self.csv_path.exists():
+                print(f"Listagem do cadastro indisponível ({e}), usando cópia local")
+                return self.csv_path
+            raise
+        
+        if not csv_link:
+            raise ValueError("Arquivo CSV de cadastro não encontrado")
+        
+        meta = self._read_meta()
+        headers = {}
+        if self.csv_path.exists() and meta.get('url') == csv_link:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+        
+        response = self.session.get(csv_link, timeout=60, stream=True, headers=headers)
+        if response.status_code == 304:
+            response.close()
+            print(f"Cadastro inalterado desde o último download: {csv_link}")
+            return self.csv_path
+        response.raise_for_status()
+        
+        print(f"Baixando cadastro de operadoras: {csv_link}")
+        part_path = self.csv_path.with_suffix('.csv.part')
+        with response, open(part_path, 'wb') as f:
+            for chunk in response.iter_content(chunk_size=1024 * 1024):
+                f.write(chunk)
+        part_path.replace(self.csv_path)
+        
+        self.meta_path.write_text(json.dumps({
+            'url': csv_link,
+            'etag': response.headers.get('etag'),
+            'last_modified': response.headers.get('last-modified')
+        }), encoding='utf-8')
+        return self.csv_path
+    
+    def load(self) -> pd.DataFrame:
+        if self._cadastro is None:
+            df = pd.read_csv(self.fetch(), encoding='utf-8', sep=';', dtype={'CNPJ': str}, low_memory=False)
+            df.columns = df.columns.str.strip()
+            
+            if 'REGISTRO_OPERADORA' in df.columns:
+                registro = df['REGISTRO_OPERADORA']
+            elif 'Registro_ANS' in df.columns:
+                registro = df['Registro_ANS']
+            else:
+                registro = pd.Series('', index=df.index)
+            
+            cadastro = pd.DataFrame(index=df.index)
+            cadastro['cnpj'] = normalize_cnpj_array(df['CNPJ'])
+            cadastro['registro_ans'] = registro.astype(str).str.strip()
+            cadastro['razao_social'] = df['Razao_Social'] if 'Razao_Social' in df.columns else ''
+            cadastro['modalidade'] = df['Modalidade'] if 'Modalidade' in df.columns else ''
+            cadastro['uf'] = df['UF'] if 'UF' in df.columns else ''
+            self._cadastro = cadastro.reset_index(drop=True)
+        
+        return self._cadastro
+    
+    def operadoras(self) -> pd.DataFrame:
+        df = self.load()
+        df = df[df['cnpj'].str.len() == 14]
+        df = df.drop_duplicates(subset=['cnpj'], keep='first')
+        # Chave inteira para os merges do processador; volta a texto com 14 dígitos em export_frame
+        return df.assign(
+            cnpj=cnpj_to_int(df['cnpj']),
+            modalidade=df['modalidade'].astype('category'),
+            uf=df['uf'].astype('category')
+        )
@@ -1,22 +1,84 @@
 import requests
 import zipfile
-from pathlib import Path
+import zlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path, PurePosixPath
 from bs4 import BeautifulSoup
-from typing import List, Tuple
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, List, Optional, Tuple
 import re
 from src.core.config import get_settings
 
 settings = get_settings()
 
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def create_session(pool_size: int = 10) -> requests.Session:
+    session = requests.Session()
+    retry = Retry(total=3, backoff_factor=1, status_forcelist=[502, 503, 504], allowed_methods=['HEAD', 'GET'])
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+class ZipMember:
+    def __init__(self, zip_path: Path, member: str, file_size: int = 0):
+        self.zip_path = Path(zip_path)
+        self.member = member
+        self.file_size = file_size
+    
+    @property
+    def name(self) -> str:
+        return PurePosixPath(self.member).name
+    
+    @property
+    def suffix(self) -> str:
+        return PurePosixPath(self.member).suffix
+    
+    def exists(self) -> bool:
+        return self.zip_path.exists()
+    
+    def is_dir(self) -> bool:
+        return self.member.endswith('/')
+    
+    def open(self, mode: str = 'rb'):
+        # O ZipExtFile mantém o arquivo do ZIP aberto até ser fechado
+        with zipfile.ZipFile(self.zip_path, 'r') as zip_ref:
+            return zip_ref.open(self.member)
+    
+    def __repr__(self) -> str:
+        return f"ZipMember({str(self.zip_path)!r}, {self.member!r})"
+    
+    def __str__(self) -> str:
+        return f"{self.zip_path}!{self.member}"
+
+
+# Até a versão anterior ANS_BASE_URL apontava para .../demonstracoes_contabeis; hoje é a raiz do PDA
+LEGACY_BASE_SUFFIX = "/demonstracoes_contabeis"
+
+
+def ans_url(path: str) -> str:
+    base_url = settings.ANS_BASE_URL.rstrip('/')
+    if base_url.endswith(LEGACY_BASE_SUFFIX):
+        base_url = base_url[:-len(LEGACY_BASE_SUFFIX)]
+    return f"{base_url}/{path}"
+
+
 class ANSDownloader:
-    def __init__(self, download_dir: str = "data/downloads"):
-        self.base_url = "https://dadosabertos.ans.gov.br/FTP/PDA/demonstracoes_contabeis"
+    def __init__(self, download_dir: str = "data/downloads", base_url: Optional[str] = None, max_workers: int = 3):
+        self.base_url = (base_url or ans_url("demonstracoes_contabeis")).rstrip('/')
         self.download_dir = Path(download_dir)
         self.download_dir.mkdir(parents=True, exist_ok=True)
+        self.max_workers = max(1, max_workers)
+        self.session = create_session(self.max_workers)
     
     def get_available_quarters(self) -> List[Tuple[str, str, str]]:
         print(f"Acessando: {self.base_url}")
-        response = requests.get(self.base_url, timeout=30)
+        response = self.session.get(self.base_url, timeout=30)
         response.raise_for_status()
         
         soup = BeautifulSoup(response.content, 'html.parser')
@@ -36,7 +98,7 @@ class ANSDownloader:
             print(f"Verificando ano: {year}")
             
             try:
-                year_response = requests.get(year_url, timeout=30)
+                year_response = self.session.get(year_url, timeout=30)
                 year_response.raise_for_status()
                 year_soup = BeautifulSoup(year_response.content, 'html.parser')
                 
@@ -56,32 +118,144 @@ class ANSDownloader:
         print(f"\nÚltimos 3 trimestres: {[(q[1]+q[0], q[2]) for q in quarters]}")
         return quarters
     
+    def download_quarters(self, quarters: List[Tuple[str, str, str]]) -> List[Path]:
+        if self.max_workers == 1 or len(quarters) <= 1:
+            return [self.download_quarter_files(year, quarter, file_url) for year, quarter, file_url in quarters]
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self.download_quarter_files, year, quarter, file_url) for year, quarter, file_url in quarters]
+            return [future.result() for future in futures]
+    
+    def _remote_info(self, file_url: str) -> Dict:
+        try:
+            response = self.session.head(file_url, timeout=30, allow_redirects=True)
+            response.raise_for_status()
+        except requests.RequestException:
+            return {}
+        
+        size = response.headers.get('content-length')
+        return {
+            'size': int(size) if size and size.isdigit() else None,
+            'etag': response.headers.get('etag'),
+            'accept_ranges': response.headers.get('accept-ranges', '').lower() == 'bytes'
+        }
+    
+    def _read_meta(self, meta_path: Path) -> Dict:
+        if not meta_path.exists():
+            return {}
+        try:
+            return json.loads(meta_path.read_text(encoding='utf-8'))
+        except (ValueError, OSError):
+            return {}
+    
+    def _write_meta(self, meta_path: Path, meta: Dict):
+        meta_path.write_text(json.dumps(meta), encoding='utf-8')
+    
+    def _is_complete(self, file_path: Path, meta: Dict, remote: Dict) -> bool:
+        size = file_path.stat().st_size
+        
+        if meta.get('size') is not None and meta['size'] != size:
+            return False
+        if remote.get('size') is not None and remote['size'] != size:
+            return False
+        if remote.get('etag') and meta.get('etag') and remote['etag'] != meta['etag']:
+            return False
+        
+        if remote.get('size') is not None or (remote.get('etag') and meta.get('etag')):
+            return True
+        if meta.get('complete') and meta.get('size') == size:
+            return True
+        
+        # Sem tamanho/ETag remotos nem registro de download concluído (ex.: arquivos baixados antes do .meta.json):
+        # só o CRC dos membros do ZIP confirma que o arquivo não está truncado
+        return self._zip_is_valid(file_path)
+    
+    def _zip_is_valid(self, file_path: Path) -> bool:
+        try:
+            with zipfile.ZipFile(file_path, 'r') as zip_ref:
+                return zip_ref.testzip() is None
+        except (zipfile.BadZipFile, OSError, EOFError, zlib.error):
+            return False
+    
     def download_quarter_files(self, year: str, quarter: str, file_url: str) -> Path:
         filename = f"{quarter}{year}.zip"
         file_path = self.download_dir / filename
+        part_path = self.download_dir / f"{filename}.part"
+        meta_path = self.download_dir / f"{filename}.meta.json"
+        
+        remote = self._remote_info(file_url)
+        meta = self._read_meta(meta_path)
         
         if file_path.exists():
-            print(f"  Arquivo já existe: {filename}")
-            return file_path
+            if self._is_complete(file_path, meta, remote):
+                print(f"  Arquivo já existe: {filename}")
+                if not meta.get('complete'):
+                    self._write_meta(meta_path, {**meta, 'url': file_url, 'size': file_path.stat().st_size, 'complete': True})
+                return file_path
+            print(f"  Arquivo em cache desatualizado ou incompleto: {filename}")
+            file_path.unlink()
         
-        print(f"  Baixando: {filename}")
-        response = requests.get(file_url, timeout=300, stream=True)
-        response.raise_for_status()
+        headers = {}
+        offset = 0
+        same_version = not remote.get('etag') or meta.get('etag') == remote.get('etag')
+        if part_path.exists() and remote.get('accept_ranges') and same_version:
+            offset = part_path.stat().st_size
+            headers['Range'] = f"bytes={offset}-"
+            if remote.get('etag'):
+                headers['If-Range'] = remote['etag']
         
-        total_size = int(response.headers.get('content-length', 0))
-        downloaded = 0
+        if remote.get('size') is not None and offset == remote['size']:
+            response = None
+        else:
+            print(f"  Baixando: {filename}" + (f" (retomando de {offset} bytes)" if offset else ""))
+            response = self.session.get(file_url, timeout=300, stream=True, headers=headers)
+            response.raise_for_status()
+            
+            if response.status_code != 206:
+                offset = 0
+            
+            self._write_meta(meta_path, {
+                'url': file_url,
+                'size': remote.get('size'),
+                'etag': response.headers.get('etag', remote.get('etag')),
+                'complete': False
+            })
+            
+            with response, open(part_path, 'ab' if offset else 'wb') as f:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
         
-        with open(file_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-                downloaded += len(chunk)
-                if total_size > 0:
-                    progress = (downloaded / total_size) * 100
-                    print(f"    Progresso: {progress:.1f}%", end='\r')
+        downloaded = part_path.stat().st_size
+        if remote.get('size') is not None and downloaded != remote['size']:
+            raise IOError(f"Download incompleto de {filename}: {downloaded} de {remote['size']} bytes")
         
-        print(f"\n    Download completo: {filename}")
+        part_path.replace(file_path)
+        self._write_meta(meta_path, {**self._read_meta(meta_path), 'size': downloaded, 'complete': True})
+        
+        print(f"    Download completo: {filename} ({downloaded} bytes)")
         return file_path
     
+    def list_zip_members(self, zip_path: Path) -> List[ZipMember]:
+        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+            members = [
+                ZipMember(zip_path, file_info.filename, file_info.file_size)
+                for file_info in zip_ref.infolist()
+                if not file_info.is_dir()
+            ]
+        
+        print(f"  {zip_path.name}: {len(members)} arquivos (leitura direta do ZIP)")
+        return members
+    
+    def _matches_member(self, path: Path, file_info: zipfile.ZipInfo) -> bool:
+        if not path.is_file() or path.stat().st_size != file_info.file_size:
+            return False
+        
+        crc = 0
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b''):
+                crc = zlib.crc32(block, crc)
+        return crc == file_info.CRC
+    
     def extract_zip(self, zip_path: Path) -> List[Path]:
         extract_dir = self.download_dir / f"extracted_{zip_path.stem}"
         extract_dir.mkdir(parents=True, exist_ok=True)
@@ -89,12 +263,19 @@ class ANSDownloader:
         print(f"  Extraindo: {zip_path.name}")
         
         extracted_files = []
+        skipped = 0
         with zipfile.ZipFile(zip_path, 'r') as zip_ref:
             for file_info in zip_ref.filelist:
                 extracted_path = extract_dir / file_info.filename
-                zip_ref.extract(file_info, extract_dir)
-                if not file_info.is_dir():
-                    extracted_files.append(extracted_path)
+                if file_info.is_dir():
+                    zip_ref.extract(file_info, extract_dir)
+                    continue
+                
+                if self._matches_member(extracted_path, file_info):
+                    skipped += 1
+                else:
+                    zip_ref.extract(file_info, extract_dir)
+                extracted_files.append(extracted_path)
         
-        print(f"  Extraídos {len(extracted_files)} arquivos")
+        print(f"  Extraídos {len(extracted_files) - skipped} arquivos ({skipped} já atualizados)")
         return extracted_files
@@ -0,0 +1,331 @@
+import io
+import re
+import pandas as pd
+from pathlib import Path
+from typing import Dict, List
+from src.core.database import engine
+from src.models.operadora import RAZAO_SOCIAL_BUSCA_SQL
+from src.etl.schema import export_frame
+
+STAGING_SCHEMA = "ans_staging"
+COPY_BATCH_ROWS = 50_000
+
+TABLES = {
+    'operadoras_cadastro': {
+        'columns': ['cnpj', 'registro_ans', 'razao_social', 'modalidade', 'uf'],
+        'ddl': """
+            CREATE TABLE IF NOT EXISTS operadoras_cadastro (
+                id SERIAL PRIMARY KEY,
+                cnpj VARCHAR(14) NOT NULL,
+                registro_ans VARCHAR(50),
+                razao_social VARCHAR(255) NOT NULL,
+                modalidade VARCHAR(100),
+                uf VARCHAR(2),
+                razao_social_busca TEXT GENERATED ALWAYS AS (""" + RAZAO_SOCIAL_BUSCA_SQL + """) STORED,
+                created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+                CONSTRAINT operadoras_cadastro_cnpj_key UNIQUE (cnpj),
+                CONSTRAINT check_cnpj_formato CHECK (cnpj ~ '^[0-9]{14}$'),
+                CONSTRAINT check_uf_formato CHECK (uf IS NULL OR LENGTH(uf) = 2)
+            )
+        """,
+        'indexes': {
+            'idx_cadastro_cnpj': '(cnpj)',
+            'idx_cadastro_cnpj_prefixo': '(cnpj varchar_pattern_ops)',
+            'idx_cadastro_uf': '(uf)',
+            'idx_cadastro_razao_social_id': '(razao_social, id)',
+        },
+    },
+    'despesas_consolidadas': {
+        'columns': ['cnpj', 'razao_social', 'trimestre', 'ano', 'valor_despesas'],
+        'ddl': """
+            CREATE TABLE IF NOT EXISTS despesas_consolidadas (
+                id SERIAL PRIMARY KEY,
+                cnpj VARCHAR(14) NOT NULL,
+                razao_social VARCHAR(255) NOT NULL,
+                trimestre VARCHAR(2) NOT NULL,
+                ano INTEGER NOT NULL,
+                valor_despesas NUMERIC(15, 2) NOT NULL,
+                created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+                CONSTRAINT check_trimestre_valido CHECK (trimestre IN ('1T', '2T', '3T', '4T')),
+                CONSTRAINT check_ano_valido CHECK (ano BETWEEN 2020 AND 2030),
+                CONSTRAINT check_valor_positivo CHECK (valor_despesas > 0),
+                CONSTRAINT unique_despesa_periodo UNIQUE (cnpj, ano, trimestre)
+            )
+        """,
+        'indexes': {
+            'idx_despesas_cnpj': '(cnpj)',
+            'idx_despesas_ano_trimestre': '(ano, trimestre)',
+            'idx_despesas_cnpj_periodo_id': '(cnpj, ano, trimestre, id)',
+            'idx_despesas_valor': '(valor_despesas DESC)',
+        },
+    },
+    'despesas_agregadas': {
+        'columns': ['razao_social', 'uf', 'total_despesas', 'media_despesas', 'desvio_padrao', 'num_registros'],
+        'ddl': """
+            CREATE TABLE IF NOT EXISTS despesas_agregadas (
+                id SERIAL PRIMARY KEY,
+                razao_social VARCHAR(255) NOT NULL,
+                uf VARCHAR(2),
+                total_despesas NUMERIC(20, 2) NOT NULL,
+                media_despesas NUMERIC(15, 2),
+                desvio_padrao NUMERIC(15, 2),
+                num_registros INTEGER,
+                created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+                CONSTRAINT check_totais_positivos CHECK (total_despesas > 0),
+                CONSTRAINT check_num_registros CHECK (num_registros > 0)
+            )
+        """,
+        'indexes': {
+            'idx_agregadas_razao_uf': '(razao_social, uf)',
+            'idx_agregadas_uf': '(uf)',
+            'idx_agregadas_total': '(total_despesas DESC)',
+        },
+    },
+}
+
+# Só criados quando a extensão pg_trgm está disponível; sem ela a API usa o índice n-gram em memória
+TRIGRAM_INDEXES = {
+    'operadoras_cadastro': {
+        'idx_cadastro_razao_social_trgm': 'USING gin (razao_social_busca gin_trgm_ops)',
+    },
+}
+
+SEARCH_COLUMN = """
+    ALTER TABLE operadoras_cadastro
+        ADD COLUMN IF NOT EXISTS razao_social_busca TEXT
+        GENERATED ALWAYS AS (""" + RAZAO_SOCIAL_BUSCA_SQL + """) STORED
+"""
+
+FOREIGN_KEY = """
+    ALTER TABLE despesas_consolidadas
+        ADD CONSTRAINT fk_despesas_operadora
+        FOREIGN KEY (cnpj)
+        REFERENCES operadoras_cadastro(cnpj)
+        ON DELETE CASCADE
+        ON UPDATE CASCADE
+"""
+
+# Estatísticas, resumos de analytics e data_version vêm dos blocos [loader:...] de sql/01 e sql/02,
+# os mesmos executados pela importação manual via psql
+SQL_DIR = Path(__file__).resolve().parents[2] / "sql"
+
+
+def sql_section(file_name: str, name: str) -> List[str]:
+    text = (SQL_DIR / file_name).read_text(encoding="utf-8")
+    start = text.index(f"-- [loader:{name}]")
+    end = text.index(f"-- [/loader:{name}]", start)
+    lines = [line for line in text[start:end].splitlines() if not line.strip().startswith("--")]
+    return [statement.strip() for statement in "\n".join(lines).split(";") if statement.strip()]
+
+
+SNAPSHOT_DDL = sql_section("01_create_tables.sql", "resumos")
+VERSION_DDL = sql_section("01_create_tables.sql", "versao")
+SNAPSHOT_REFRESH = sql_section("02_import_data.sql", "atualizacao")
+VERSION_REFRESH = sql_section("02_import_data.sql", "publicacao")
+SNAPSHOT_TABLES = [re.match(r"CREATE TABLE IF NOT EXISTS (\w+)", statement).group(1) for statement in SNAPSHOT_DDL if statement.startswith("CREATE TABLE")]
+
+UPSERT = {
+    'operadoras_cadastro': """
+        INSERT INTO operadoras_cadastro (cnpj, registro_ans, razao_social, modalidade, uf)
+        SELECT cnpj, registro_ans, razao_social, modalidade, uf FROM {staging}
+        ON CONFLICT (cnpj) DO UPDATE SET
+            registro_ans = EXCLUDED.registro_ans,
+            razao_social = EXCLUDED.razao_social,
+            modalidade = EXCLUDED.modalidade,
+            uf = EXCLUDED.uf
+    """,
+    'despesas_consolidadas': """
+        INSERT INTO despesas_consolidadas (cnpj, razao_social, trimestre, ano, valor_despesas)
+        SELECT cnpj, razao_social, trimestre, ano, valor_despesas FROM {staging}
+        ON CONFLICT ON CONSTRAINT unique_despesa_periodo DO UPDATE SET
+            razao_social = EXCLUDED.razao_social,
+            valor_despesas = EXCLUDED.valor_despesas
+    """,
+}
+
+
+# Operadoras que mudaram de UF: seus trimestres entram na carga para os resumos por UF serem refeitos
+UF_CHANGED = """
+    CREATE TEMP TABLE uf_alterada ON COMMIT DROP AS
+    SELECT s.cnpj FROM {staging} s
+    JOIN operadoras_cadastro oc ON oc.cnpj = s.cnpj
+    WHERE oc.uf IS DISTINCT FROM s.uf
+"""
+
+
+class PostgresLoader:
+    def __init__(self, bind=None):
+        self.engine = bind or engine
+    
+    def prepare_frames(self, df_cadastro: pd.DataFrame, df_consolidated: pd.DataFrame, df_aggregated: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+        # Fronteira de exportação: CNPJ volta a texto com 14 dígitos e centavos voltam a reais
+        df_cadastro, df_consolidated, df_aggregated = (export_frame(df) for df in (df_cadastro, df_consolidated, df_aggregated))
+        
+        cadastro = df_cadastro[TABLES['operadoras_cadastro']['columns']]
+        cadastro = cadastro[cadastro['razao_social'].notna()]
+        
+        despesas = df_consolidated.rename(columns={
+            'CNPJ': 'cnpj',
+            'RazaoSocial': 'razao_social',
+            'Trimestre': 'trimestre',
+            'Ano': 'ano',
+            'ValorDespesas': 'valor_despesas'
+        })[TABLES['despesas_consolidadas']['columns']]
+        
+        agregadas = df_aggregated.rename(columns={
+            'RazaoSocial': 'razao_social',
+            'UF': 'uf',
+            'TotalDespesas': 'total_despesas',
+            'MediaDespesas': 'media_despesas',
+            'DesvioPadrao': 'desvio_padrao',
+            'NumRegistros': 'num_registros'
+        })[TABLES['despesas_agregadas']['columns']]
+        
+        return {
+            'operadoras_cadastro': cadastro,
+            'despesas_consolidadas': despesas,
+            'despesas_agregadas': agregadas,
+        }
+    
+    def _copy(self, cursor, table: str, df: pd.DataFrame):
+        columns = ', '.join(df.columns)
+        for start in range(0, len(df), COPY_BATCH_ROWS):
+            buffer = io.StringIO()
+            df.iloc[start:start + COPY_BATCH_ROWS].to_csv(buffer, index=False, header=False)
+            buffer.seek(0)
+            cursor.copy_expert(f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+    
+    def _create_indexes(self, cursor, table: str, trigram: bool = False):
+        indexes = dict(TABLES[table]['indexes'])
+        if trigram:
+            indexes.update(TRIGRAM_INDEXES.get(table, {}))
+        for name, definition in indexes.items():
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} {definition}")
+    
+    def _enable_trigram(self, cursor) -> bool:
+        cursor.execute("SAVEPOINT enable_trigram")
+        try:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        except Exception as e:
+            cursor.execute("ROLLBACK TO SAVEPOINT enable_trigram")
+            print(f"  pg_trgm indisponível, busca usará o índice em memória da API: {str(e).strip()}")
+            return False
+        cursor.execute("RELEASE SAVEPOINT enable_trigram")
+        return True
+    
+    def ensure_schema(self):
+        connection = self.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            trigram = self._enable_trigram(cursor)
+            for table, spec in TABLES.items():
+                cursor.execute(spec['ddl'])
+                if table == 'operadoras_cadastro':
+                    cursor.execute(SEARCH_COLUMN)
+                self._create_indexes(cursor, table, trigram)
+            cursor.execute("""
+                SELECT 1 FROM pg_constraint WHERE conname = 'fk_despesas_operadora'
+            """)
+            if cursor.fetchone() is None:
+                cursor.execute(FOREIGN_KEY)
+            for statement in SNAPSHOT_DDL + VERSION_DDL:
+                cursor.execute(statement)
+            connection.commit()
+        finally:
+            connection.close()
+    
+    def refresh_snapshots(self, cursor, loaded: str):
+        # carga_despesas lista as despesas da carga; só as operadoras e períodos delas são recalculados
+        cursor.execute(f"CREATE TEMP TABLE carga_despesas ON COMMIT DROP AS {loaded}")
+        for statement in SNAPSHOT_REFRESH:
+            cursor.execute(statement)
+        print("  Estatísticas e resumos de analytics atualizados")
+    
+    def publish_version(self, cursor):
+        for statement in VERSION_DDL + VERSION_REFRESH:
+            cursor.execute(statement)
+    
+    def load(self, frames: Dict[str, pd.DataFrame], mode: str = "replace"):
+        if mode == "replace":
+            self._load_replace(frames)
+        elif mode == "upsert":
+            self._load_upsert(frames)
+        else:
+            raise ValueError(f"Modo de carga inválido: {mode}")
+    
+    def _load_replace(self, frames: Dict[str, pd.DataFrame]):
+        connection = self.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            trigram = self._enable_trigram(cursor)
+            cursor.execute("SELECT current_schema()")
+            schema = cursor.fetchone()[0]
+            
+            # Tabelas, estatísticas e resumos são montados num schema de staging com os mesmos nomes:
+            # o SQL de sql/ roda sem alteração e o lock só cobre a troca de schema
+            cursor.execute(f"DROP SCHEMA IF EXISTS {STAGING_SCHEMA} CASCADE")
+            cursor.execute(f"CREATE SCHEMA {STAGING_SCHEMA}")
+            cursor.execute(f"SET LOCAL search_path TO {STAGING_SCHEMA}, {schema}")
+            for table, spec in TABLES.items():
+                cursor.execute(spec['ddl'])
+                self._copy(cursor, table, frames[table])
+                self._create_indexes(cursor, table, trigram)
+                cursor.execute(f"ANALYZE {table}")
+                print(f"  {STAGING_SCHEMA}.{table}: {len(frames[table])} registros")
+            cursor.execute(FOREIGN_KEY)
+            for statement in SNAPSHOT_DDL:
+                cursor.execute(statement)
+            self.refresh_snapshots(cursor, "SELECT cnpj, ano, trimestre FROM despesas_consolidadas")
+            connection.commit()
+            
+            # SET SCHEMA leva junto índices, constraints e sequências; data_version continua no schema atual
+            tables = list(TABLES) + SNAPSHOT_TABLES
+            cursor.execute("SELECT tablename FROM pg_tables WHERE schemaname = %s AND tablename = ANY(%s)", (schema, tables))
+            live = [row[0] for row in cursor.fetchall()]
+            if live:
+                cursor.execute(f"LOCK TABLE {', '.join(live)} IN ACCESS EXCLUSIVE MODE")
+                cursor.execute(f"DROP TABLE {', '.join(live)} CASCADE")
+            for table in tables:
+                cursor.execute(f"ALTER TABLE {STAGING_SCHEMA}.{table} SET SCHEMA {schema}")
+            cursor.execute(f"DROP SCHEMA {STAGING_SCHEMA}")
+            self.publish_version(cursor)
+            connection.commit()
+            print("  Tabelas de staging promovidas")
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
+    
+    def _load_upsert(self, frames: Dict[str, pd.DataFrame]):
+        self.ensure_schema()
+        connection = self.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            
+            for table in ['operadoras_cadastro', 'despesas_consolidadas']:
+                staging = f"tmp_{table}"
+                columns = ', '.join(TABLES[table]['columns'])
+                cursor.execute(f"CREATE TEMP TABLE {staging} ON COMMIT DROP AS SELECT {columns} FROM {table} WITH NO DATA")
+                self._copy(cursor, staging, frames[table])
+                if table == 'operadoras_cadastro':
+                    cursor.execute(UF_CHANGED.format(staging=staging))
+                cursor.execute(UPSERT[table].format(staging=staging))
+                print(f"  {table}: {cursor.rowcount} registros inseridos/atualizados")
+            
+            cursor.execute("DELETE FROM despesas_agregadas")
+            self._copy(cursor, 'despesas_agregadas', frames['despesas_agregadas'])
+            print(f"  despesas_agregadas: {len(frames['despesas_agregadas'])} registros")
+            
+            self.refresh_snapshots(cursor, """
+                SELECT cnpj, ano, trimestre FROM tmp_despesas_consolidadas
+                UNION ALL
+                SELECT dc.cnpj, dc.ano, dc.trimestre FROM despesas_consolidadas dc JOIN uf_alterada u ON u.cnpj = dc.cnpj
+            """)
+            self.publish_version(cursor)
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
@@ -0,0 +1,76 @@
+import hashlib
+import json
+import pandas as pd
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable
+from src.etl.schema import PARTITION_SCHEMA
+
+
+class RunManifest:
+    def __init__(self, output_dir: str = "data/processed"):
+        self.output_dir = Path(output_dir)
+        self.path = self.output_dir / "manifest.json"
+        self.partitions_dir = self.output_dir / "partitions"
+        self.partitions_dir.mkdir(parents=True, exist_ok=True)
+        self.quarters: Dict[str, Dict] = self._load()
+    
+    def _load(self) -> Dict[str, Dict]:
+        if not self.path.exists():
+            return {}
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+        except (ValueError, OSError):
+            return {}
+        # Partições gravadas com outro layout (ex.: valores em float) são reprocessadas
+        if data.get('schema') != PARTITION_SCHEMA:
+            return {}
+        return data.get('quarters', {})
+    
+    def save(self):
+        tmp_path = self.path.with_suffix('.json.tmp')
+        tmp_path.write_text(json.dumps({'schema': PARTITION_SCHEMA, 'quarters': self.quarters}, indent=2), encoding='utf-8')
+        tmp_path.replace(self.path)
+    
+    def reset(self):
+        for key in list(self.quarters):
+            self._drop(key)
+        self.quarters = {}
+    
+    @staticmethod
+    def checksum(file_path: Path) -> str:
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+    
+    def partition_path(self, key: str) -> Path:
+        return self.partitions_dir / f"despesas_{key}.parquet"
+    
+    def is_current(self, key: str, checksum: str) -> bool:
+        entry = self.quarters.get(key)
+        return bool(entry) and entry['sha256'] == checksum and self.partition_path(key).exists()
+    
+    def load_partition(self, key: str) -> pd.DataFrame:
+        return pd.read_parquet(self.partition_path(key))
+    
+    def save_partition(self, key: str, source: Path, checksum: str, partition: pd.DataFrame):
+        partition.to_parquet(self.partition_path(key), index=False)
+        self.quarters[key] = {
+            'source': Path(source).name,
+            'sha256': checksum,
+            'partition': self.partition_path(key).name,
+            'rows': len(partition),
+            'processed_at': datetime.now().isoformat(timespec='seconds')
+        }
+    
+    def retain(self, keys: Iterable[str]):
+        keep = set(keys)
+        for key in list(self.quarters):
+            if key not in keep:
+                self._drop(key)
+    
+    def _drop(self, key: str):
+        self.quarters.pop(key, None)
+        self.partition_path(key).unlink(missing_ok=True)
@@ -1,16 +1,49 @@
 import pandas as pd
 from pathlib import Path
-from typing import List, Dict, Tuple
-from src.etl.validator import validate_cnpj, normalize_cnpj
-from bs4 import BeautifulSoup
-import requests
+from typing import List, Dict, Tuple, Optional, Iterator, Union, Set
+from src.etl.validator import validate_cnpj_array
+import hashlib
 import re
 import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from openpyxl import load_workbook
+from src.core.config import get_settings
+from src.etl.cadastro import CadastroProvider
+from src.etl.schema import (
+    REG_ANS_DTYPE, TRIMESTRE_DTYPE, ANO_DTYPE, parse_reg_ans, to_centavos, cnpj_to_int,
+    PARTITION_SCHEMA, concat_frames, typed_frame, export_frame
+)
+from src.etl.aggregates import (
+    aggregate_state, merge_aggregate_state, combine_states, data_periods, period_mask, period_key, source_keys
+)
+from src.etl.sniffer import FormatSniffer, find_columns, ENCODINGS, SEPARATORS
+
+settings = get_settings()
+
+DESPESAS_COLUMNS = ['REG_ANS', 'Trimestre', 'Ano', 'ValorDespesas', 'Descricao']
+PARTITION_COLUMNS = ['REG_ANS', 'Trimestre', 'Ano', 'ValorDespesas']
+PARTITION_KEYS = ['REG_ANS', 'Trimestre', 'Ano']
+AGGREGATE_STATE_FILE = "despesas_agregadas_estado.parquet"
+
+def _process_file_task(task: Tuple[str, int, str, str, Path]) -> Optional[pd.DataFrame]:
+    output_dir, chunksize, year, quarter, file_path = task
+    return ANSProcessor(output_dir, chunksize).process_file(year, quarter, file_path)
+
 
 class ANSProcessor:
-    def __init__(self, output_dir: str = "data/processed"):
+    def __init__(self, output_dir: str = "data/processed", chunksize: Optional[int] = None, cadastro: Optional[CadastroProvider] = None):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        # Pico de memória na leitura: no máximo `chunksize` linhas das colunas projetadas por vez
+        self.chunksize = chunksize or settings.ETL_CHUNK_SIZE
+        self.sniffer = FormatSniffer(output_dir)
+        self._cadastro = cadastro
+    
+    @property
+    def cadastro(self) -> CadastroProvider:
+        if self._cadastro is None:
+            self._cadastro = CadastroProvider()
+        return self._cadastro
     
     def find_despesas_files(self, file_paths: List[Path]) -> List[Tuple[str, str, Path]]:
         files = []
@@ -38,17 +71,16 @@ class ANSProcessor:
         return files
     
     def read_file(self, file_path: Path) -> pd.DataFrame:
-        encodings = ['utf-8', 'latin1', 'iso-8859-1', 'cp1252']
-        
-        for encoding in encodings:
+        for encoding in ENCODINGS:
             try:
                 if file_path.suffix.lower() in ['.xlsx', '.xls']:
-                    return pd.read_excel(file_path)
+                    with file_path.open('rb') as f:
+                        return pd.read_excel(f)
                 elif file_path.suffix.lower() in ['.csv', '.txt']:
-                    separators = [';', ',', '|', '\t']
-                    for sep in separators:
+                    for sep in SEPARATORS:
                         try:
-                            df = pd.read_csv(file_path, encoding=encoding, sep=sep, low_memory=False)
+                            with file_path.open('rb') as f:
+                                df = pd.read_csv(f, encoding=encoding, sep=sep, low_memory=False)
                             if len(df.columns) > 1:
                                 return df
                         except:
@@ -58,6 +90,63 @@ class ANSProcessor:
         
         raise ValueError(f"Não foi possível ler o arquivo: {file_path}")
     
+    def read_file_chunks(self, file_path: Path, file_format: Optional[Dict] = None) -> Iterator[pd.DataFrame]:
+        file_format = file_format or self.sniffer.sniff(file_path)
+        columns = file_format['columns']
+        
+        if file_format['kind'] == 'xlsx':
+            chunks = self._read_excel_chunks(file_path, file_format)
+        else:
+            chunks = self._read_csv_chunks(file_path, file_format)
+        
+        for chunk in chunks:
+            chunk = chunk.rename(columns={col: name for name, col in columns.items() if col is not None})
+            filtered = self._filter_eventos_sinistros(chunk)
+            if len(filtered) > 0:
+                yield filtered
+    
+    def _read_csv_chunks(self, file_path: Path, file_format: Dict) -> Iterator[pd.DataFrame]:
+        columns = file_format['columns']
+        usecols = [col for col in columns.values() if col is not None]
+        # REG_ANS e valor ficam com o parser numérico do pandas; texto só onde é texto
+        dtype = {col: str for name, col in columns.items() if col is not None and name not in ('REG_ANS', 'VL_SALDO_FINAL')}
+        
+        with file_path.open('rb') as f:
+            reader = pd.read_csv(
+                f,
+                encoding=file_format['encoding'],
+                encoding_errors='replace',
+                sep=file_format['sep'],
+                decimal=file_format.get('decimal', '.'),
+                usecols=usecols,
+                dtype=dtype,
+                chunksize=self.chunksize
+            )
+            with reader:
+                yield from reader
+    
+    def _read_excel_chunks(self, file_path: Path, file_format: Dict) -> Iterator[pd.DataFrame]:
+        header = file_format['header']
+        wanted = [col for col in file_format['columns'].values() if col is not None]
+        indexes = [header.index(col) for col in wanted]
+        
+        with file_path.open('rb') as f:
+            yield from self._iter_excel_rows(f, indexes, wanted)
+    
+    def _iter_excel_rows(self, f, indexes: List[int], wanted: List[str]) -> Iterator[pd.DataFrame]:
+        workbook = load_workbook(f, read_only=True, data_only=True)
+        try:
+            rows = []
+            for row in workbook.active.iter_rows(min_row=2, values_only=True):
+                rows.append([row[i] if i < len(row) else None for i in indexes])
+                if len(rows) >= self.chunksize:
+                    yield pd.DataFrame(rows, columns=wanted)
+                    rows = []
+            if rows:
+                yield pd.DataFrame(rows, columns=wanted)
+        finally:
+            workbook.close()
+    
     def _extract_quarter(self, date_str) -> str:
         if pd.isna(date_str):
             return 'Q1'
@@ -78,119 +167,141 @@ class ANSProcessor:
         if 'DESCRICAO' not in df.columns:
             return df
         
-        mask = df['DESCRICAO'].astype(str).str.upper().apply(
-            lambda x: any(kw in x for kw in keywords)
-        )
+        pattern = '|'.join(keywords)
+        mask = df['DESCRICAO'].astype(str).str.upper().str.contains(pattern, regex=True, na=False)
         return df[mask]
     
-    def process_files(self, data_files: List[Tuple[str, str, Path]]) -> List[Dict]:
-        all_data = []
+    def _extract_columns(self, df: pd.DataFrame, year: str, quarter: str) -> pd.DataFrame:
+        # Tipos compactos já por chunk: REG_ANS inteiro, valor em centavos, período e descrição categóricos
+        extracted = pd.DataFrame({
+            'REG_ANS': parse_reg_ans(df['REG_ANS']),
+            'Trimestre': pd.Series(quarter, index=df.index, dtype=TRIMESTRE_DTYPE),
+            'Ano': pd.Series(int(year) if year else pd.NA, index=df.index, dtype=ANO_DTYPE),
+            'ValorDespesas': to_centavos(df['VL_SALDO_FINAL']),
+            'Descricao': (df['DESCRICAO'] if 'DESCRICAO' in df.columns else pd.Series('', index=df.index)).astype('category'),
+        }, index=df.index)
+        return extracted[DESPESAS_COLUMNS]
+    
+    def process_files(self, data_files: List[Tuple[str, str, Path]], workers: int = 1) -> pd.DataFrame:
+        if workers > 1 and len(data_files) > 1:
+            tasks = [(str(self.output_dir), self.chunksize, year, quarter, file_path) for year, quarter, file_path in data_files]
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(_process_file_task, tasks))
+        else:
+            results = [self.process_file(year, quarter, file_path) for year, quarter, file_path in data_files]
         
-        for year, quarter, file_path in data_files:
-            try:
-                print(f"  Lendo: {file_path.name}")
-                df = self.read_file(file_path)
-                print(f"    Shape original: {df.shape}")
-                
-                df.columns = df.columns.str.upper().str.strip()
-                
-                df_eventos = self._filter_eventos_sinistros(df)
-                print(f"    Registros de eventos/sinistros: {len(df_eventos)}")
-                
-                if len(df_eventos) == 0:
-                    continue
-                
-                reg_col = None
-                for col in df_eventos.columns:
-                    if 'REG' in col and 'ANS' in col:
-                        reg_col = col
-                        break
-                    if col == 'REG_ANS':
-                        reg_col = col
-                        break
-                
-                if not reg_col:
-                    print(f"    Coluna REG_ANS não encontrada, pulando...")
-                    continue
-                
-                valor_col = None
-                for col in df_eventos.columns:
-                    if 'SALDO_FINAL' in col or 'VL_SALDO_FINAL' in col:
-                        valor_col = col
-                        break
-                    if 'VALOR' in col:
-                        valor_col = col
-                        break
-                
-                if not valor_col:
-                    print(f"    Coluna de valor não encontrada, pulando...")
-                    continue
-                
-                for _, row in df_eventos.iterrows():
-                    record = {
-                        'REG_ANS': str(row[reg_col]).strip(),
-                        'Trimestre': quarter,
-                        'Ano': year,
-                        'ValorDespesas': row[valor_col],
-                        'Descricao': row.get('DESCRICAO', '')
-                    }
-                    all_data.append(record)
-                    
-            except Exception as e:
-                print(f"    Erro ao processar {file_path.name}: {str(e)}")
-                continue
+        frames = [df for df in results if df is not None]
+        if frames:
+            all_data = concat_frames(frames)
+        else:
+            all_data = pd.DataFrame(columns=DESPESAS_COLUMNS)
         
         print(f"\n  Total de registros extraídos: {len(all_data)}")
         return all_data
     
-    def consolidate_data(self, data: List[Dict], output_file: str = "consolidado_despesas.csv") -> pd.DataFrame:
+    def process_file(self, year: str, quarter: str, file_path: Path) -> Optional[pd.DataFrame]:
+        try:
+            print(f"  Lendo: {file_path.name}")
+            
+            if file_path.suffix.lower() == '.xls':
+                file_frames = self._process_legacy_excel(file_path, year, quarter)
+            else:
+                file_frames = self._extract_file_frames(file_path, year, quarter)
+            
+            if file_frames is None:
+                return None
+            
+            print(f"    Registros de eventos/sinistros: {sum(len(f) for f in file_frames)}")
+            if not file_frames:
+                return None
+            return concat_frames(file_frames)
+        
+        except Exception as e:
+            print(f"    Erro ao processar {file_path.name}: {str(e)}")
+            return None
+    
+    def _extract_file_frames(self, file_path: Path, year: str, quarter: str) -> Optional[List[pd.DataFrame]]:
+        file_format = self.sniffer.sniff(file_path)
+        
+        if not self._has_required_columns(file_format['columns']):
+            return None
+        
+        return [self._extract_columns(chunk, year, quarter) for chunk in self.read_file_chunks(file_path, file_format)]
+    
+    def _process_legacy_excel(self, file_path: Path, year: str, quarter: str) -> Optional[List[pd.DataFrame]]:
+        df = self.read_file(file_path)
+        columns = find_columns(df.columns)
+        
+        if not self._has_required_columns(columns):
+            return None
+        
+        df = df.rename(columns={col: name for name, col in columns.items() if col is not None})
+        df_eventos = self._filter_eventos_sinistros(df)
+        return [self._extract_columns(df_eventos, year, quarter)]
+    
+    def _has_required_columns(self, columns: Dict) -> bool:
+        if not columns['REG_ANS']:
+            print(f"    Coluna REG_ANS não encontrada, pulando...")
+            return False
+        
+        if not columns['VL_SALDO_FINAL']:
+            print(f"    Coluna de valor não encontrada, pulando...")
+            return False
+        
+        return True
+    
+    def aggregate_despesas(self, data: pd.DataFrame) -> pd.DataFrame:
         if len(data) == 0:
-            print("\n AVISO: Nenhum dado foi extraído dos arquivos!")
-            df = pd.DataFrame(columns=['CNPJ', 'RazaoSocial', 'Trimestre', 'Ano', 'ValorDespesas'])
-            output_path = self.output_dir / output_file
-            df.to_csv(output_path, index=False, encoding='utf-8-sig')
-            return df
+            return pd.DataFrame(columns=PARTITION_COLUMNS)
         
-        df = pd.DataFrame(data)
+        df = data[PARTITION_COLUMNS]
         
         print(f"\nTotal de registros antes da limpeza: {len(df)}")
         
-        df['REG_ANS'] = df['REG_ANS'].astype(str).str.strip()
-        df = df[df['REG_ANS'].str.len() > 0]
-        df = df[df['REG_ANS'] != 'nan']
-        
-        df['ValorDespesas'] = pd.to_numeric(df['ValorDespesas'], errors='coerce').fillna(0)
+        df = df[df['REG_ANS'].notna()]
         
         print(f"\nInconsistências encontradas:")
-        zeros_negativos = len(df[df['ValorDespesas'] <= 0])
+        zeros_negativos = int((df['ValorDespesas'] <= 0).sum())
         print(f"- Valores zerados ou negativos: {zeros_negativos}")
         
         df = df[df['ValorDespesas'] > 0]
         
-        df_agg = df.groupby(['REG_ANS', 'Trimestre', 'Ano']).agg({
-            'ValorDespesas': 'sum'
-        }).reset_index()
+        partition = self._sum_by_period(df)
+        partition['REG_ANS'] = partition['REG_ANS'].astype(REG_ANS_DTYPE)
+        return partition
+    
+    def _sum_by_period(self, df: pd.DataFrame) -> pd.DataFrame:
+        # Somas inteiras em centavos: exatas, sem o arredondamento de float que o NUMERIC(15,2) escondia
+        return df.groupby(PARTITION_KEYS, observed=True, dropna=False)['ValorDespesas'].sum().reset_index()
+    
+    def consolidate_data(self, data: Optional[pd.DataFrame] = None, output_file: str = "consolidado_despesas.csv", partitions: Optional[List[pd.DataFrame]] = None) -> pd.DataFrame:
+        if partitions is None:
+            partitions = [self.aggregate_despesas(data)]
+        partitions = [p for p in partitions if len(p) > 0]
         
-        print(f"\nBaixando cadastro para enriquecer dados...")
-        cadastro_url = "https://dadosabertos.ans.gov.br/FTP/PDA/operadoras_de_plano_de_saude_ativas/"
-        response = requests.get(cadastro_url, timeout=30)
-        soup = BeautifulSoup(response.content, 'html.parser')
+        if not partitions:
+            print("\n AVISO: Nenhum dado foi extraído dos arquivos!")
+            df = pd.DataFrame(columns=['CNPJ', 'RazaoSocial', 'Trimestre', 'Ano', 'ValorDespesas'])
+            self.save_artifact(df, output_file)
+            return df
         
-        csv_link = None
-        for link in soup.find_all('a', href=True):
-            if '.csv' in link['href'].lower():
-                csv_link = cadastro_url + link['href']
-                break
+        df_agg = self._sum_by_period(concat_frames(partitions))
         
-        if csv_link:
-            df_cadastro = pd.read_csv(csv_link, encoding='utf-8', sep=';', low_memory=False)
-            df_cadastro.columns = df_cadastro.columns.str.strip()
-            
-            df_cadastro['REG_ANS'] = df_cadastro['Registro_ANS'].astype(str).str.strip() if 'Registro_ANS' in df_cadastro.columns else df_cadastro['REGISTRO_OPERADORA'].astype(str).str.strip()
-            df_cadastro['CNPJ'] = df_cadastro['CNPJ'].apply(lambda x: normalize_cnpj(str(x)) if pd.notna(x) else '')
-            df_cadastro['RazaoSocial'] = df_cadastro['Razao_Social'] if 'Razao_Social' in df_cadastro.columns else ''
-            
-            df_cadastro_clean = df_cadastro[['REG_ANS', 'CNPJ', 'RazaoSocial']].drop_duplicates(subset=['REG_ANS'], keep='first')
+        print(f"\nCarregando cadastro para enriquecer dados...")
+        try:
+            df_cadastro = self.cadastro.load()
+        except ValueError as e:
+            print(f"- {e}")
+            df_cadastro = None
+        
+        if df_cadastro is not None:
+            df_cadastro_clean = df_cadastro.rename(columns={
+                'registro_ans': 'REG_ANS',
+                'cnpj': 'CNPJ',
+                'razao_social': 'RazaoSocial'
+            })[['REG_ANS', 'CNPJ', 'RazaoSocial']]
+            df_cadastro_clean = df_cadastro_clean.assign(REG_ANS=parse_reg_ans(df_cadastro_clean['REG_ANS'])).dropna(subset=['REG_ANS'])
+            df_cadastro_clean = df_cadastro_clean.astype({'REG_ANS': REG_ANS_DTYPE}).drop_duplicates(subset=['REG_ANS'], keep='first')
             
             df_merged = df_agg.merge(df_cadastro_clean, on='REG_ANS', how='left')
             
@@ -200,7 +311,7 @@ class ANSProcessor:
             df_merged = df_merged[df_merged['CNPJ'].notna()]
             df_merged = df_merged[df_merged['CNPJ'].str.len() > 0]
             
-            df_valid = df_merged[df_merged['CNPJ'].apply(validate_cnpj)]
+            df_valid = df_merged[validate_cnpj_array(df_merged['CNPJ'])]
             invalidos = len(df_merged) - len(df_valid)
             print(f"- CNPJs inválidos removidos: {invalidos}")
             df_merged = df_valid
@@ -208,17 +319,21 @@ class ANSProcessor:
             cnpj_razoes = df_merged.groupby('CNPJ')['RazaoSocial'].nunique()
             duplicados = len(cnpj_razoes[cnpj_razoes > 1])
             print(f"- CNPJs com razões sociais diferentes: {duplicados}")
+            
+            df_merged = df_merged.assign(
+                CNPJ=cnpj_to_int(df_merged['CNPJ']),
+                RazaoSocial=df_merged['RazaoSocial'].astype('category')
+            )
         else:
             df_merged = df_agg.copy()
-            df_merged['CNPJ'] = ''
+            df_merged['CNPJ'] = pd.Series(pd.NA, index=df_merged.index, dtype='Int64')
             df_merged['RazaoSocial'] = ''
         
-        df_final = df_merged[['CNPJ', 'RazaoSocial', 'Trimestre', 'Ano', 'ValorDespesas']]
+        df_final = df_merged[['CNPJ', 'RazaoSocial', 'Trimestre', 'Ano', 'ValorDespesas']].reset_index(drop=True)
         
         print(f"\nTotal de registros após limpeza: {len(df_final)}")
         
-        output_path = self.output_dir / output_file
-        df_final.to_csv(output_path, index=False, encoding='utf-8-sig')
+        output_path = self.save_artifact(df_final, output_file)
         print(f"\nArquivo consolidado salvo: {output_path}")
         
         zip_path = self.output_dir / output_file.replace('.csv', '.zip')
@@ -229,44 +344,16 @@ class ANSProcessor:
         return df_final
     
     def download_operadoras_cadastro(self, output_file: str = "operadoras_cadastro.csv") -> Path:
-        cadastro_url = "https://dadosabertos.ans.gov.br/FTP/PDA/operadoras_de_plano_de_saude_ativas/"
-        
-        response = requests.get(cadastro_url, timeout=30)
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        csv_link = None
-        for link in soup.find_all('a', href=True):
-            if '.csv' in link['href'].lower():
-                csv_link = cadastro_url + link['href']
-                break
-        
-        if not csv_link:
-            raise ValueError("Arquivo CSV de cadastro não encontrado")
-        
-        print(f"Baixando cadastro de operadoras: {csv_link}")
-        
-        df = pd.read_csv(csv_link, encoding='utf-8', sep=';', low_memory=False)
-        df.columns = df.columns.str.strip()
+        df_normalized = self.cadastro.operadoras()
         
-        df_normalized = pd.DataFrame()
-        df_normalized['cnpj'] = df['CNPJ'].apply(lambda x: normalize_cnpj(str(x)) if pd.notna(x) else '')
-        df_normalized['registro_ans'] = df['REGISTRO_OPERADORA'].astype(str).str.strip() if 'REGISTRO_OPERADORA' in df.columns else ''
-        df_normalized['razao_social'] = df['Razao_Social'] if 'Razao_Social' in df.columns else ''
-        df_normalized['modalidade'] = df['Modalidade'] if 'Modalidade' in df.columns else ''
-        df_normalized['uf'] = df['UF'] if 'UF' in df.columns else ''
-        
-        df_normalized = df_normalized[df_normalized['cnpj'].str.len() == 14]
-        df_normalized = df_normalized.drop_duplicates(subset=['cnpj'], keep='first')
-        
-        output_path = self.output_dir / output_file
-        df_normalized.to_csv(output_path, index=False, encoding='utf-8-sig')
+        output_path = self.save_artifact(df_normalized, output_file)
         
         print(f"Cadastro salvo: {output_path} ({len(df_normalized)} operadoras)")
         return output_path
     
-    def enrich_data(self, consolidated_csv: str, cadastro_csv: str, output_file: str = "despesas_enriquecidas.csv") -> pd.DataFrame:
-        df_despesas = pd.read_csv(self.output_dir / consolidated_csv, encoding='utf-8-sig', dtype={'CNPJ': str})
-        df_cadastro = pd.read_csv(self.output_dir / cadastro_csv, encoding='utf-8-sig', dtype={'cnpj': str})
+    def enrich_data(self, consolidated: Union[pd.DataFrame, str], output_file: str = "despesas_enriquecidas.csv") -> pd.DataFrame:
+        df_despesas = self._as_frame(consolidated).copy()
+        df_cadastro = self.cadastro.operadoras()
         
         df_cadastro = df_cadastro.rename(columns={
             'cnpj': 'CNPJ',
@@ -276,9 +363,6 @@ class ANSProcessor:
             'uf': 'UF'
         })
         
-        df_despesas['CNPJ'] = df_despesas['CNPJ'].astype(str).str.strip()
-        df_cadastro['CNPJ'] = df_cadastro['CNPJ'].astype(str).str.strip()
-        
         df_cadastro_clean = df_cadastro[['CNPJ', 'RegistroANS', 'Modalidade', 'UF']].drop_duplicates(subset=['CNPJ'], keep='first')
         
         print(f"\nRegistros de despesas: {len(df_despesas)}")
@@ -289,30 +373,91 @@ class ANSProcessor:
         unmatched = df_enriched['RegistroANS'].isna().sum() if 'RegistroANS' in df_enriched.columns else 0
         print(f"Registros sem match no cadastro: {unmatched}")
         
-        output_path = self.output_dir / output_file
-        df_enriched.to_csv(output_path, index=False, encoding='utf-8-sig')
+        output_path = self.save_artifact(df_enriched, output_file)
         print(f"\nDados enriquecidos salvos: {output_path}")
         
         return df_enriched
     
-    def aggregate_data(self, enriched_csv: str, output_file: str = "despesas_agregadas.csv") -> pd.DataFrame:
-        df = pd.read_csv(self.output_dir / enriched_csv, encoding='utf-8-sig')
+    def aggregate_data(
+        self,
+        enriched: Union[pd.DataFrame, str],
+        output_file: str = "despesas_agregadas.csv",
+        period_sources: Optional[Dict[Tuple[int, str], Set[str]]] = None,
+        full_refresh: bool = False
+    ) -> pd.DataFrame:
+        df = self._as_frame(enriched)
         
         if 'UF' not in df.columns:
-            df['UF'] = 'N/A'
+            df = df.assign(UF='N/A')
         
-        df_agg = df.groupby(['RazaoSocial', 'UF']).agg({
-            'ValorDespesas': ['sum', 'mean', 'std', 'count']
-        }).reset_index()
+        state = self._update_aggregate_state(df, period_sources, full_refresh)
+        df_agg = merge_aggregate_state(state)
         
-        df_agg.columns = ['RazaoSocial', 'UF', 'TotalDespesas', 'MediaDespesas', 'DesvioPadrao', 'NumRegistros']
-        
-        df_agg['DesvioPadrao'] = df_agg['DesvioPadrao'].fillna(0)
-        
-        df_agg = df_agg.sort_values('TotalDespesas', ascending=False)
+        output_path = self.save_artifact(df_agg, output_file)
+        print(f"\nDados agregados salvos: {output_path}")
         
+        return df_agg
+    
+    def _update_aggregate_state(
+        self,
+        df: pd.DataFrame,
+        period_sources: Optional[Dict[Tuple[int, str], Set[str]]],
+        full_refresh: bool
+    ) -> pd.DataFrame:
+        # Reaproveita um período do estado salvo só se ele veio dos mesmos ZIPs (sha256 do manifesto) e com o mesmo cadastro.
+        # Não depende do que mudou nesta execução: uma execução interrompida depois do manifest.save() não deixa estado velho
+        state_path = self.output_dir / AGGREGATE_STATE_FILE
+        fingerprint = self._cadastro_fingerprint()
+        sources = source_keys(period_sources or {})
+        previous = None
+        
+        if not full_refresh and sources and fingerprint and state_path.exists():
+            previous = pd.read_parquet(state_path)
+            if previous.attrs.get('cadastro') != fingerprint or previous.attrs.get('schema') != PARTITION_SCHEMA:
+                previous = None
+        
+        if previous is None:
+            state = aggregate_state(df)
+        else:
+            saved = previous.attrs.get('sources') or {}
+            reuse = {
+                period for period in data_periods(previous) & data_periods(df)
+                if period_key(period) in sources and saved.get(period_key(period)) == sources[period_key(period)]
+            }
+            state = combine_states([
+                previous[period_mask(previous, reuse)],
+                aggregate_state(df[~period_mask(df, reuse)])
+            ])
+            print(f"\nEstado de agregação: {len(reuse)} trimestre(s) reaproveitado(s)")
+        
+        state.attrs = {'cadastro': fingerprint, 'schema': PARTITION_SCHEMA, 'sources': sources}
+        state.to_parquet(state_path, index=False)
+        return state
+    
+    def _cadastro_fingerprint(self) -> Optional[str]:
+        try:
+            df_cadastro = self.cadastro.load()
+        except ValueError:
+            return None
+        hashes = pd.util.hash_pandas_object(df_cadastro[['cnpj', 'registro_ans', 'razao_social', 'uf']], index=False)
+        return hashlib.sha256(hashes.to_numpy().tobytes()).hexdigest()
+    
+    def save_artifact(self, df: pd.DataFrame, output_file: str) -> Path:
         output_path = self.output_dir / output_file
-        df_agg.to_csv(output_path, index=False, encoding='utf-8-sig')
-        print(f"\nDados agregados salvos: {output_path}")
+        df = export_frame(df)
+        df.to_csv(output_path, index=False, encoding='utf-8-sig')
+        df.to_parquet(output_path.with_suffix('.parquet'), index=False)
+        return output_path
+    
+    def load_artifact(self, output_file: str) -> pd.DataFrame:
+        output_path = self.output_dir / output_file
+        parquet_path = output_path.with_suffix('.parquet')
         
-        return df_agg
\ No newline at end of file
+        if parquet_path.exists():
+            return typed_frame(pd.read_parquet(parquet_path))
+        return typed_frame(pd.read_csv(output_path, encoding='utf-8-sig', dtype={'CNPJ': str, 'cnpj': str}))
+    
+    def _as_frame(self, data: Union[pd.DataFrame, str]) -> pd.DataFrame:
+        if isinstance(data, pd.DataFrame):
+            return data
+        return self.load_artifact(data)
\ No newline at end of file
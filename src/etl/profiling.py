@@ -0,0 +1,223 @@
+import cProfile
+import io
+import json
+import os
+import platform
+import pstats
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Optional
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+PROC_IO = Path("/proc/self/io")
+PROC_STATUS = Path("/proc/self/status")
+PROC_CLEAR_REFS = Path("/proc/self/clear_refs")
+
+
+@dataclass
+class StageStats:
+    name: str
+    calls: int = 0
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    rows_in: Optional[int] = None
+    rows_out: Optional[int] = None
+    bytes_read: Optional[int] = None
+    bytes_written: Optional[int] = None
+    peak_rss_bytes: Optional[int] = None
+    python_peak_bytes: Optional[int] = None
+    extra: Dict = field(default_factory=dict)
+    
+    def add_rows(self, rows_in: Optional[int] = None, rows_out: Optional[int] = None):
+        if rows_in is not None:
+            self.rows_in = (self.rows_in or 0) + rows_in
+        if rows_out is not None:
+            self.rows_out = (self.rows_out or 0) + rows_out
+    
+    def as_dict(self) -> Dict:
+        data = asdict(self)
+        extra = data.pop("extra")
+        # Vazão sobre o maior volume da etapa: entrada nas reduções (agregação), saída nas leituras
+        rows = max(self.rows_in or 0, self.rows_out or 0)
+        data["wall_seconds"] = round(self.wall_seconds, 3)
+        data["cpu_seconds"] = round(self.cpu_seconds, 3)
+        data["rows_per_s"] = round(rows / self.wall_seconds, 1) if rows and self.wall_seconds else None
+        data.update(extra)
+        return data
+
+
+def _cpu_seconds() -> float:
+    # process_time cobre todas as threads (downloads); RUSAGE_CHILDREN soma os workers do --workers já encerrados
+    total = time.process_time()
+    if resource is not None:
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        total += children.ru_utime + children.ru_stime
+    return total
+
+
+def _io_counters() -> Optional[Dict[str, int]]:
+    try:
+        lines = PROC_IO.read_text().splitlines()
+    except OSError:
+        return None
+    counters = dict(line.split(": ") for line in lines)
+    return {"read": int(counters["rchar"]), "written": int(counters["wchar"])}
+
+
+def _reset_peak_rss() -> bool:
+    # Linux >= 4.0: zera o VmHWM, permitindo medir o pico de cada etapa e não só o do processo
+    try:
+        PROC_CLEAR_REFS.write_text("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss() -> Optional[int]:
+    try:
+        for line in PROC_STATUS.read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class RunProfiler:
+    def __init__(self, profile: bool = False, profile_dir: Optional[str] = None):
+        self.profile = profile
+        self.profile_dir = Path(profile_dir or "data/processed/profile")
+        self.stages: Dict[str, StageStats] = {}
+        self.started_at = datetime.now(timezone.utc)
+        self._started = time.perf_counter()
+        self._profilers: Dict[str, cProfile.Profile] = {}
+        self._snapshots: Dict[str, Path] = {}
+        self._peak_rss_per_stage = _reset_peak_rss()
+    
+    @contextmanager
+    def stage(self, name: str):
+        stats = self.stages.setdefault(name, StageStats(name))
+        stats.calls += 1
+        
+        if self._peak_rss_per_stage:
+            _reset_peak_rss()
+        io_before = _io_counters()
+        cpu_before = _cpu_seconds()
+        profiler = None
+        if self.profile:
+            profiler = self._profilers.setdefault(name, cProfile.Profile())
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+            profiler.enable()
+        started = time.perf_counter()
+        
+        try:
+            yield stats
+        finally:
+            stats.wall_seconds += time.perf_counter() - started
+            if profiler is not None:
+                profiler.disable()
+            stats.cpu_seconds += _cpu_seconds() - cpu_before
+            
+            io_after = _io_counters()
+            if io_before and io_after:
+                stats.bytes_read = (stats.bytes_read or 0) + io_after["read"] - io_before["read"]
+                stats.bytes_written = (stats.bytes_written or 0) + io_after["written"] - io_before["written"]
+            peak = _peak_rss()
+            if peak is not None:
+                stats.peak_rss_bytes = max(stats.peak_rss_bytes or 0, peak)
+            # Depois das medições: o dump do snapshot não entra no tempo de CPU nem nos bytes gravados da etapa
+            if profiler is not None:
+                self._trace_memory(name, stats)
+    
+    def _trace_memory(self, name: str, stats: StageStats):
+        _, peak = tracemalloc.get_traced_memory()
+        stats.python_peak_bytes = max(stats.python_peak_bytes or 0, peak)
+        # Um snapshot por etapa (o da última chamada); só o da etapa mais lenta fica no fim
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        path = self.profile_dir / f"{name}.tracemalloc"
+        tracemalloc.take_snapshot().dump(str(path))
+        self._snapshots[name] = path
+    
+    def slowest_stage(self) -> Optional[StageStats]:
+        if not self.stages:
+            return None
+        return max(self.stages.values(), key=lambda stats: stats.wall_seconds)
+    
+    def _dump_profiles(self) -> Optional[Dict]:
+        slowest = self.slowest_stage()
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        if slowest is None or slowest.name not in self._profilers:
+            return None
+        
+        prof_path = self.profile_dir / f"{slowest.name}.prof"
+        self._profilers[slowest.name].dump_stats(str(prof_path))
+        
+        summary = io.StringIO()
+        pstats.Stats(str(prof_path), stream=summary).sort_stats("cumulative").print_stats(40)
+        summary_path = self.profile_dir / f"{slowest.name}.txt"
+        summary_path.write_text(summary.getvalue(), encoding="utf-8")
+        
+        for name, path in self._snapshots.items():
+            if name != slowest.name:
+                path.unlink(missing_ok=True)
+        
+        snapshot = self._snapshots.get(slowest.name)
+        return {
+            "stage": slowest.name,
+            "cprofile": str(prof_path),
+            "cprofile_summary": str(summary_path),
+            "tracemalloc": str(snapshot) if snapshot else None,
+        }
+    
+    def report(self) -> Dict:
+        report = {
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "wall_seconds": round(time.perf_counter() - self._started, 3),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "peak_rss_per_stage": self._peak_rss_per_stage,
+            "profiled": self.profile,
+            "stages": {name: stats.as_dict() for name, stats in self.stages.items()},
+        }
+        slowest = self.slowest_stage()
+        report["slowest_stage"] = slowest.name if slowest else None
+        return report
+    
+    def save(self, path: str) -> Dict:
+        report = self.report()
+        if self.profile:
+            report["profile"] = self._dump_profiles()
+        
+        output = Path(path)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+        return report
+    
+    def print_summary(self):
+        print(f"{'Etapa':<22}{'Tempo (s)':>11}{'CPU (s)':>10}{'Entrada':>10}{'Saída':>10}{'Linhas/s':>12}{'Pico RSS (MB)':>15}")
+        for stats in self.stages.values():
+            data = stats.as_dict()
+            rows_in = stats.rows_in if stats.rows_in is not None else "-"
+            rows_out = stats.rows_out if stats.rows_out is not None else "-"
+            peak = f"{stats.peak_rss_bytes / 1024 / 1024:.0f}" if stats.peak_rss_bytes else "-"
+            print(
+                f"{stats.name:<22}{data['wall_seconds']:>11.2f}{data['cpu_seconds']:>10.2f}"
+                f"{rows_in:>10}{rows_out:>10}{data['rows_per_s'] or '-':>12}{peak:>15}"
+            )
@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import CategoricalDtype, union_categoricals
+from typing import List
+from src.etl.validator import normalize_cnpj_array
+
+# Tipos internos do pipeline: chaves inteiras, períodos categóricos e dinheiro em centavos (int64).
+# A conversão de volta (CNPJ com 14 dígitos, valores em reais) só acontece em export_frame,
+# chamada ao gravar CSV/parquet e ao preparar a carga no banco.
+REG_ANS_DTYPE = 'int32'
+CNPJ_DTYPE = 'int64'
+ANO_DTYPE = 'Int16'
+CENTAVOS_DTYPE = 'int64'
+TRIMESTRE_DTYPE = CategoricalDtype(['1T', '2T', '3T', '4T'])
+CENTAVOS = 100
+
+# Versão do layout das partições em data/processed/partitions; o manifesto descarta partições de outra versão
+PARTITION_SCHEMA = 2
+
+CNPJ_COLUMNS = ['CNPJ', 'cnpj']
+# Somas ficam em centavos inteiros; média e desvio padrão, em centavos float
+CENTAVOS_COLUMNS = ['ValorDespesas', 'TotalDespesas']
+MONEY_COLUMNS = CENTAVOS_COLUMNS + ['MediaDespesas', 'DesvioPadrao']
+CATEGORY_COLUMNS = ['RazaoSocial', 'Modalidade', 'UF', 'Descricao', 'razao_social', 'modalidade', 'uf']
+REG_ANS_MAX = np.iinfo(np.int32).max
+
+
+def parse_reg_ans(values: pd.Series) -> pd.Series:
+    numbers = pd.to_numeric(pd.Series(values), errors='coerce')
+    numbers = numbers.where((numbers % 1 == 0) & (numbers > 0) & (numbers <= REG_ANS_MAX))
+    return numbers.astype('Int32')
+
+def parse_ano(values: pd.Series) -> pd.Series:
+    return pd.to_numeric(pd.Series(values), errors='coerce').astype(ANO_DTYPE)
+
+def to_centavos(values: pd.Series) -> pd.Series:
+    if not pd.api.types.is_numeric_dtype(values):
+        values = decimal_text_to_float(values)
+    reais = pd.to_numeric(values, errors='coerce').astype('float64')
+    return (reais * CENTAVOS).round().fillna(0).astype(CENTAVOS_DTYPE)
+
+def decimal_text_to_float(values: pd.Series) -> pd.Series:
+    # Layout da ANS: vírgula decimal ("1234,56"); quando há vírgula, pontos só podem ser separador de milhar
+    text = pd.Series(values).astype(str).str.strip()
+    comma = text.str.contains(',', regex=False)
+    if comma.any():
+        text = text.where(~comma, text.str.replace('.', '', regex=False).str.replace(',', '.', regex=False))
+    return pd.to_numeric(text, errors='coerce')
+
+def from_centavos(values: pd.Series) -> pd.Series:
+    return values.astype('float64') / CENTAVOS
+
+def cnpj_to_int(values: pd.Series) -> pd.Series:
+    normalized = normalize_cnpj_array(values)
+    numbers = pd.to_numeric(normalized.where(normalized.str.len() == 14), errors='coerce').astype('Int64')
+    return numbers if numbers.hasnans else numbers.astype(CNPJ_DTYPE)
+
+def format_cnpj(values: pd.Series) -> pd.Series:
+    return values.astype('Int64').astype('string').str.zfill(14)
+
+def concat_frames(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    # pd.concat só preserva categóricas com as mesmas categorias; sem isso colunas como Descricao voltariam a object
+    for column in frames[0].columns:
+        dtypes = [frame[column].dtype for frame in frames]
+        if all(isinstance(dtype, CategoricalDtype) for dtype in dtypes) and len(set(dtypes)) > 1:
+            categories = union_categoricals([frame[column] for frame in frames]).categories
+            frames = [frame.assign(**{column: frame[column].cat.set_categories(categories)}) for frame in frames]
+    return pd.concat(frames, ignore_index=True)
+
+def typed_frame(df: pd.DataFrame) -> pd.DataFrame:
+    # Inverso de export_frame, para artefatos relidos de data/processed
+    df = df.copy()
+    for column in df.columns:
+        if column in CNPJ_COLUMNS:
+            df[column] = cnpj_to_int(df[column])
+        elif column == 'REG_ANS':
+            df[column] = parse_reg_ans(df[column])
+        elif column in CENTAVOS_COLUMNS:
+            df[column] = to_centavos(df[column])
+        elif column in MONEY_COLUMNS:
+            df[column] = pd.to_numeric(df[column], errors='coerce') * CENTAVOS
+        elif column == 'Trimestre':
+            df[column] = df[column].astype(str).astype(TRIMESTRE_DTYPE)
+        elif column == 'Ano':
+            df[column] = parse_ano(df[column])
+        elif column in CATEGORY_COLUMNS:
+            df[column] = df[column].astype('category')
+    return df
+
+def export_frame(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
+    for column in df.columns:
+        if column in CNPJ_COLUMNS and pd.api.types.is_integer_dtype(df[column]):
+            df[column] = format_cnpj(df[column])
+        elif column == 'REG_ANS' and pd.api.types.is_integer_dtype(df[column]):
+            df[column] = df[column].astype('string')
+        elif column in MONEY_COLUMNS and pd.api.types.is_numeric_dtype(df[column]):
+            df[column] = from_centavos(df[column])
+    return df
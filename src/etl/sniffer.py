@@ -0,0 +1,146 @@
+import codecs
+import csv
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+from openpyxl import load_workbook
+
+ENCODINGS = ['utf-8', 'latin1', 'iso-8859-1', 'cp1252']
+SEPARATORS = [';', ',', '|', '\t']
+SNIFF_BYTES = 64 * 1024
+EXCEL_SUFFIXES = ['.xlsx', '.xlsm']
+
+
+def find_columns(columns) -> Dict[str, Optional[str]]:
+    normalized = {str(col).upper().strip(): col for col in columns}
+    
+    reg_col = None
+    for name, col in normalized.items():
+        if 'REG' in name and 'ANS' in name:
+            reg_col = col
+            break
+        if name == 'REG_ANS':
+            reg_col = col
+            break
+    
+    valor_col = None
+    for name, col in normalized.items():
+        if 'SALDO_FINAL' in name or 'VL_SALDO_FINAL' in name:
+            valor_col = col
+            break
+        if 'VALOR' in name:
+            valor_col = col
+            break
+    
+    return {
+        'REG_ANS': reg_col,
+        'VL_SALDO_FINAL': valor_col,
+        'DESCRICAO': normalized.get('DESCRICAO')
+    }
+
+
+class FormatSniffer:
+    def __init__(self, cache_dir: str = "data/processed"):
+        self.cache_path = Path(cache_dir) / "cache_formatos.json"
+        self._cache = self._load_cache()
+    
+    def _load_cache(self) -> Dict[str, Dict]:
+        if not self.cache_path.exists():
+            return {}
+        try:
+            return json.loads(self.cache_path.read_text(encoding='utf-8'))
+        except (ValueError, OSError):
+            return {}
+    
+    def _save_cache(self):
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(self._cache, indent=2, ensure_ascii=False), encoding='utf-8')
+        os.replace(tmp_path, self.cache_path)
+    
+    def _remember(self, signature: str, file_format: Dict) -> Dict:
+        self._cache[signature] = file_format
+        self._save_cache()
+        return file_format
+    
+    def sniff(self, file_path: Path) -> Dict:
+        if file_path.suffix.lower() in EXCEL_SUFFIXES:
+            return self._sniff_excel(file_path)
+        
+        with file_path.open('rb') as f:
+            sample = f.read(SNIFF_BYTES)
+        
+        header_bytes = sample.split(b'\n', 1)[0].rstrip(b'\r')
+        signature = 'csv:' + hashlib.sha1(header_bytes).hexdigest()
+        
+        cached = self._cache.get(signature)
+        if cached and self._decodes(sample, cached['encoding']):
+            return cached
+        
+        for encoding in ENCODINGS:
+            if not self._decodes(sample, encoding):
+                continue
+            
+            header = header_bytes.decode(encoding).lstrip('\ufeff')
+            for sep in SEPARATORS:
+                columns = next(csv.reader([header], delimiter=sep))
+                if len(columns) > 1:
+                    found = find_columns(columns)
+                    return self._remember(signature, {
+                        'kind': 'csv',
+                        'encoding': encoding,
+                        'sep': sep,
+                        'decimal': self._decimal(sample.decode(encoding, errors='replace'), sep, columns, found['VL_SALDO_FINAL']),
+                        'header': columns,
+                        'columns': found
+                    })
+        
+        raise ValueError(f"Não foi possível ler o arquivo: {file_path}")
+    
+    def _decimal(self, text: str, sep: str, header: List[str], valor_col: Optional[str]) -> str:
+        # Só um atalho para o parser do pandas: valores fora do padrão detectado caem no to_centavos como texto
+        if sep == ',' or valor_col is None:
+            return '.'
+        position = header.index(valor_col)
+        lines = text.splitlines()[1:-1]
+        values = [row[position] for row in csv.reader(lines, delimiter=sep) if len(row) > position]
+        return ',' if any(',' in value for value in values) else '.'
+    
+    def _decodes(self, sample: bytes, encoding: str) -> bool:
+        try:
+            codecs.getincrementaldecoder(encoding)().decode(sample)
+            return True
+        except UnicodeDecodeError:
+            return False
+    
+    def _sniff_excel(self, file_path: Path) -> Dict:
+        header = self.read_excel_header(file_path)
+        signature = 'xlsx:' + hashlib.sha1('\x1f'.join(header).encode('utf-8')).hexdigest()
+        
+        cached = self._cache.get(signature)
+        if cached:
+            return cached
+        
+        return self._remember(signature, {
+            'kind': 'xlsx',
+            'encoding': None,
+            'sep': None,
+            'header': header,
+            'columns': find_columns(header)
+        })
+    
+    def read_excel_header(self, file_path: Path) -> List[str]:
+        with file_path.open('rb') as f:
+            return self._read_excel_header(f)
+    
+    def _read_excel_header(self, f) -> List[str]:
+        workbook = load_workbook(f, read_only=True, data_only=True)
+        try:
+            sheet = workbook.active
+            for row in sheet.iter_rows(max_row=1, values_only=True):
+                return ['' if value is None else str(value) for value in row]
+            return []
+        finally:
+            workbook.close()
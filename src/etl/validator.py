@@ -1,32 +1,40 @@
-import re
+import numpy as np
+import pandas as pd
 
-def normalize_cnpj(cnpj: str) -> str:
-    return re.sub(r'[^0-9]', '', cnpj)
+CNPJ_WEIGHTS_FIRST = np.array([5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2])
+CNPJ_WEIGHTS_SECOND = np.array([6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2])
 
-def validate_cnpj(cnpj: str) -> bool:
-    cnpj = re.sub(r'[^0-9]', '', cnpj)
-    
-    if len(cnpj) != 14:
-        return False
-    
-    if cnpj == cnpj[0] * 14:
-        return False
-    
-    def calculate_digit(cnpj_partial, weights):
-        total = sum(int(cnpj_partial[i]) * weights[i] for i in range(len(weights)))
-        remainder = total % 11
-        return 0 if remainder < 2 else 11 - remainder
+def normalize_cnpj_array(cnpjs) -> pd.Series:
+    series = cnpjs if isinstance(cnpjs, pd.Series) else pd.Series(np.asarray(cnpjs, dtype=object))
+    series = series.where(series.notna(), '')
+    return series.astype(str).str.replace(r'[^0-9]', '', regex=True)
+
+def _check_digit(digits: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    remainder = (digits @ weights) % 11
+    return np.where(remainder < 2, 0, 11 - remainder)
+
+def validate_cnpj_array(cnpjs) -> np.ndarray:
+    normalized = normalize_cnpj_array(cnpjs)
+    valid = (normalized.str.len() == 14).to_numpy()
     
-    weights_first = [5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]
-    first_digit = calculate_digit(cnpj[:12], weights_first)
+    if not valid.any():
+        return valid
     
-    if int(cnpj[12]) != first_digit:
-        return False
+    candidates = normalized.to_numpy()[valid]
+    digits = np.frombuffer(''.join(candidates).encode('ascii'), dtype=np.uint8).reshape(-1, 14).astype(np.int64) - ord('0')
     
-    weights_second = [6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2]
-    second_digit = calculate_digit(cnpj[:13], weights_second)
+    repeated = (digits == digits[:, :1]).all(axis=1)
+    first_ok = digits[:, 12] == _check_digit(digits[:, :12], CNPJ_WEIGHTS_FIRST)
+    second_ok = digits[:, 13] == _check_digit(digits[:, :13], CNPJ_WEIGHTS_SECOND)
     
-    return int(cnpj[13]) == second_digit
+    valid[valid] = ~repeated & first_ok & second_ok
+    return valid
+
+def normalize_cnpj(cnpj: str) -> str:
+    return normalize_cnpj_array([cnpj]).iloc[0]
+
+def validate_cnpj(cnpj: str) -> bool:
+    return bool(validate_cnpj_array([cnpj])[0])
 
 def validate_positive_value(value) -> bool:
     try:
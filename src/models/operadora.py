@@ -1,6 +1,11 @@
-from sqlalchemy import Column, String, Integer, Numeric, Index
+from sqlalchemy import Column, String, Integer, BigInteger, Numeric, Index, DateTime, Text, Computed
 from src.core.database import Base
 
+# Mesma normalização no banco (coluna gerada) e na API (termo buscado e índice em memória)
+ACENTOS = "ÁÀÂÃÄÉÈÊËÍÌÎÏÓÒÔÕÖÚÙÛÜÇÑáàâãäéèêëíìîïóòôõöúùûüçñ"
+SEM_ACENTOS = "aaaaaeeeeiiiiooooouuuucnaaaaaeeeeiiiiooooouuuucn"
+RAZAO_SOCIAL_BUSCA_SQL = f"translate(lower(razao_social), '{ACENTOS}', '{SEM_ACENTOS}')"
+
 
 class DespesaConsolidada(Base):
     __tablename__ = "despesas_consolidadas"
@@ -9,11 +14,12 @@ class DespesaConsolidada(Base):
     cnpj = Column(String(14), nullable=False, index=True)
     razao_social = Column(String(255), nullable=False)
     trimestre = Column(String(10), nullable=False)
-    ano = Column(String(4), nullable=False)
+    ano = Column(Integer, nullable=False)
     valor_despesas = Column(Numeric(15, 2), nullable=False)
     
     __table_args__ = (
         Index('idx_cnpj_ano_trimestre', 'cnpj', 'ano', 'trimestre'),
+        Index('idx_despesas_cnpj_periodo_id', 'cnpj', 'ano', 'trimestre', 'id'),
     )
 
 
@@ -26,6 +32,11 @@ class OperadoraCadastro(Base):
     razao_social = Column(String(255))
     modalidade = Column(String(100))
     uf = Column(String(2))
+    razao_social_busca = Column(Text, Computed(RAZAO_SOCIAL_BUSCA_SQL, persisted=True))
+    
+    __table_args__ = (
+        Index('idx_cadastro_razao_social_id', 'razao_social', 'id'),
+    )
 
 
 class DespesaAgregada(Base):
@@ -42,3 +53,99 @@ class DespesaAgregada(Base):
     __table_args__ = (
         Index('idx_razao_social_uf', 'razao_social', 'uf'),
     )
+
+
+class EstatisticaGeral(Base):
+    __tablename__ = "estatisticas_gerais"
+    
+    id = Column(Integer, primary_key=True)
+    total_operadoras = Column(Integer, nullable=False)
+    total_despesas = Column(Numeric(20, 2), nullable=False)
+    media_despesas = Column(Numeric(15, 2), nullable=False)
+    total_registros = Column(Integer, nullable=False)
+    atualizado_em = Column(DateTime(timezone=True))
+
+
+class EstatisticaTopOperadora(Base):
+    __tablename__ = "estatisticas_top_operadoras"
+    
+    posicao = Column(Integer, primary_key=True)
+    cnpj = Column(String(14), nullable=False)
+    razao_social = Column(String(255), nullable=False)
+    total_despesas = Column(Numeric(20, 2), nullable=False)
+    uf = Column(String(2))
+
+
+class EstatisticaUF(Base):
+    __tablename__ = "estatisticas_uf"
+    
+    uf = Column(String(2), primary_key=True)
+    total_despesas = Column(Numeric(20, 2), nullable=False)
+    num_operadoras = Column(Integer, nullable=False)
+    percentual = Column(Numeric(5, 2), nullable=False)
+
+
+class DataVersion(Base):
+    __tablename__ = "data_version"
+    
+    id = Column(Integer, primary_key=True)
+    versao = Column(BigInteger, nullable=False)
+    atualizado_em = Column(DateTime(timezone=True))
+
+
+# Linhas de analytics_* que resumem todos os anos / todos os trimestres
+ANALYTICS_TODOS_ANOS = 0
+ANALYTICS_TODOS_TRIMESTRES = "*"
+
+
+class AnalyticsCrescimento(Base):
+    __tablename__ = "analytics_crescimento"
+    
+    ano = Column(Integer, primary_key=True)
+    cnpj = Column(String(14), primary_key=True)
+    razao_social = Column(String(255), nullable=False)
+    primeiro_ano = Column(Integer, nullable=False)
+    primeiro_trimestre = Column(String(10), nullable=False)
+    valor_inicial = Column(Numeric(15, 2), nullable=False)
+    ultimo_ano = Column(Integer, nullable=False)
+    ultimo_trimestre = Column(String(10), nullable=False)
+    valor_final = Column(Numeric(15, 2), nullable=False)
+    num_trimestres = Column(Integer, nullable=False)
+    crescimento_percentual = Column(Numeric)
+    
+    __table_args__ = (
+        Index('idx_analytics_crescimento_ranking', 'ano', crescimento_percentual.desc()),
+    )
+
+
+class AnalyticsPeriodo(Base):
+    __tablename__ = "analytics_periodo"
+    
+    ano = Column(Integer, primary_key=True)
+    trimestre = Column(String(10), primary_key=True)
+    total_despesas = Column(Numeric(20, 2), nullable=False)
+    media_despesas = Column(Numeric, nullable=False)
+    num_registros = Column(Integer, nullable=False)
+    num_operadoras = Column(Integer, nullable=False)
+
+
+class AnalyticsUF(Base):
+    __tablename__ = "analytics_uf"
+    
+    ano = Column(Integer, primary_key=True)
+    trimestre = Column(String(10), primary_key=True)
+    uf = Column(String(2), primary_key=True)
+    total_despesas = Column(Numeric(20, 2), nullable=False)
+    media_despesas = Column(Numeric, nullable=False)
+    num_operadoras = Column(Integer, nullable=False)
+    num_registros = Column(Integer, nullable=False)
+
+
+class AnalyticsAcimaMedia(Base):
+    __tablename__ = "analytics_acima_media"
+    
+    ano = Column(Integer, primary_key=True)
+    trimestre = Column(String(10), primary_key=True)
+    cnpj = Column(String(14), primary_key=True)
+    razao_social = Column(String(255), nullable=False)
+    trimestres_acima_media = Column(Integer, nullable=False)
@@ -0,0 +1,37 @@
+import csv
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+CONTAS = [
+    ("41", "EVENTOS/ SINISTROS CONHECIDOS OU AVISADOS DE ASSISTÊNCIA A SAÚDE MEDICO HOSPITALAR"),
+    ("4111", "EVENTOS INDENIZÁVEIS LÍQUIDOS / SINISTROS RETIDOS"),
+    ("31", "CONTRAPRESTAÇÕES EFETIVAS DE PLANO DE ASSISTÊNCIA À SAÚDE"),
+    ("46", "DESPESAS ADMINISTRATIVAS"),
+]
+
+
+@pytest.fixture
+def quarter_csv(tmp_path):
+    # Demonstrativo trimestral no layout da ANS: latin1, ";", campos entre aspas e vírgula decimal
+    def build(rows: int, year: int = 2025, quarter: int = 1, seed: int = 7) -> Path:
+        rng = np.random.default_rng(seed)
+        conta = rng.integers(0, len(CONTAS), size=rows)
+        saldo = np.round(rng.lognormal(mean=11, sigma=2, size=rows), 2)
+        path = tmp_path / f"{quarter}T{year}.csv"
+        pd.DataFrame({
+            "DATA": f"{year}-{(quarter - 1) * 3 + 1:02d}-01",
+            "REG_ANS": rng.integers(300000, 300200, size=rows).astype(str),
+            "CD_CONTA_CONTABIL": np.array([codigo for codigo, _ in CONTAS])[conta],
+            "DESCRICAO": np.array([descricao for _, descricao in CONTAS])[conta],
+            "VL_SALDO_INICIAL": saldo / 2,
+            "VL_SALDO_FINAL": saldo,
+        }).to_csv(path, sep=";", index=False, encoding="latin1", quoting=csv.QUOTE_ALL, float_format="%.2f", decimal=",")
+        return path
+    return build
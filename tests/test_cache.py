@@ -0,0 +1,52 @@
+import asyncio
+import threading
+
+from src.core.cache import MemoryCache, NullCache, ResponseCache, SQLiteCache
+
+
+def test_null_cache_skips_version_query_and_locks():
+    cache = ResponseCache(NullCache())
+
+    async def compute():
+        return b"{}"
+
+    # db=None: sem cache, get_or_compute não consulta data_version
+    assert asyncio.run(cache.get_or_compute("ns", {"page": 1}, None, compute)) == b"{}"
+    assert cache._locks == {}
+
+
+class RecordingSQLiteCache(SQLiteCache):
+    def __init__(self, path: str):
+        super().__init__(path)
+        self.threads = set()
+
+    def get(self, key):
+        self.threads.add(threading.get_ident())
+        return super().get(key)
+
+    def set(self, key, value, ttl):
+        self.threads.add(threading.get_ident())
+        super().set(key, value, ttl)
+
+
+def test_sqlite_cache_runs_off_the_event_loop(tmp_path):
+    backend = RecordingSQLiteCache(str(tmp_path / "cache.sqlite3"))
+    cache = ResponseCache(backend, version_check_interval=60)
+    cache._store_version(1)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return {"ok": True}
+
+    async def run():
+        loop_thread = threading.get_ident()
+        first = await cache.get_or_compute("ns", {"page": 1}, None, compute)
+        second = await cache.get_or_compute("ns", {"page": 1}, None, compute)
+        return loop_thread, first, second
+
+    loop_thread, first, second = asyncio.run(run())
+    assert first == second == {"ok": True}
+    assert calls == [1]
+    assert backend.threads and loop_thread not in backend.threads
+    assert not MemoryCache.blocking
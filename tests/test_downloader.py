@@ -0,0 +1,163 @@
+import io
+import json
+import threading
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.etl import downloader
+from src.etl.downloader import ANSDownloader
+
+
+def make_zip(content: bytes) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as zip_ref:
+        zip_ref.writestr('1T2025.csv', content)
+    return buffer.getvalue()
+
+
+class ZipServer:
+    def __init__(self, payload: bytes, etag: str = '"v1"'):
+        self.payload = payload
+        self.etag = etag
+        self.honor_range = True
+        self.headers = True
+        self.requests = []
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, body: bytes, status: int, content_range: str = None):
+                self.send_response(status)
+                if server.headers:
+                    self.send_header('Content-Length', str(len(body)))
+                    self.send_header('ETag', server.etag)
+                    self.send_header('Accept-Ranges', 'bytes')
+                if content_range:
+                    self.send_header('Content-Range', content_range)
+                self.end_headers()
+
+            def do_HEAD(self):
+                server.requests.append(('HEAD', None))
+                self._send(server.payload, 200)
+
+            def do_GET(self):
+                range_header = self.headers.get('Range')
+                server.requests.append(('GET', range_header))
+
+                if_range = self.headers.get('If-Range')
+                if range_header and server.honor_range and (if_range is None or if_range == server.etag):
+                    start = int(range_header.split('=')[1].split('-')[0])
+                    body = server.payload[start:]
+                    self._send(body, 206, f"bytes {start}-{len(server.payload) - 1}/{len(server.payload)}")
+                else:
+                    body = server.payload
+                    self._send(body, 200)
+                self.wfile.write(body)
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/1T2025.zip"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def gets(self):
+        return [header for method, header in self.requests if method == 'GET']
+
+
+@pytest.fixture
+def server():
+    zip_server = ZipServer(make_zip(b'A' * 100000))
+    zip_server.thread.start()
+    yield zip_server
+    zip_server.httpd.shutdown()
+    zip_server.httpd.server_close()
+
+
+def write_partial(download_dir, payload: bytes, etag: str):
+    (download_dir / '1T2025.zip.part').write_bytes(payload[:len(payload) // 3])
+    meta = {'url': 'x', 'size': len(payload), 'etag': etag, 'complete': False}
+    (download_dir / '1T2025.zip.meta.json').write_text(json.dumps(meta), encoding='utf-8')
+
+
+def test_resume_interrupted_download(tmp_path, server):
+    write_partial(tmp_path, server.payload, server.etag)
+
+    path = ANSDownloader(str(tmp_path)).download_quarter_files('2025', '1T', server.url)
+
+    assert path.read_bytes() == server.payload
+    assert server.gets() == [f"bytes={len(server.payload) // 3}-"]
+    assert not (tmp_path / '1T2025.zip.part').exists()
+    assert json.loads((tmp_path / '1T2025.zip.meta.json').read_text())['complete'] is True
+
+
+def test_etag_change_downloads_again(tmp_path, server):
+    downloader = ANSDownloader(str(tmp_path))
+    downloader.download_quarter_files('2025', '1T', server.url)
+
+    # Mesmo tamanho, conteúdo novo: só o ETag denuncia a nova versão
+    server.payload = make_zip(b'B' * 100000)
+    server.etag = '"v2"'
+    path = downloader.download_quarter_files('2025', '1T', server.url)
+
+    assert path.read_bytes() == server.payload
+    assert server.gets() == [None, None]
+
+
+def test_etag_change_discards_partial(tmp_path, server):
+    write_partial(tmp_path, server.payload, '"v0"')
+
+    path = ANSDownloader(str(tmp_path)).download_quarter_files('2025', '1T', server.url)
+
+    assert path.read_bytes() == server.payload
+    assert server.gets() == [None]
+
+
+def test_full_response_instead_of_partial(tmp_path, server):
+    write_partial(tmp_path, server.payload, server.etag)
+    # Anuncia Accept-Ranges no HEAD mas ignora o Range e responde 200 com o arquivo inteiro
+    server.honor_range = False
+
+    path = ANSDownloader(str(tmp_path)).download_quarter_files('2025', '1T', server.url)
+
+    assert path.read_bytes() == server.payload
+    assert server.gets() == [f"bytes={len(server.payload) // 3}-"]
+
+
+def test_truncated_file_without_headers_or_meta(tmp_path, server):
+    server.headers = False
+    (tmp_path / '1T2025.zip').write_bytes(server.payload[:-100])
+    downloader = ANSDownloader(str(tmp_path))
+
+    path = downloader.download_quarter_files('2025', '1T', server.url)
+    assert path.read_bytes() == server.payload
+    assert server.gets() == [None]
+
+    # Baixado por completo, o .meta.json confirma o arquivo sem novo GET
+    downloader.download_quarter_files('2025', '1T', server.url)
+    assert server.gets() == [None]
+
+
+def test_valid_file_without_headers_or_meta(tmp_path, server):
+    server.headers = False
+    (tmp_path / '1T2025.zip').write_bytes(server.payload)
+
+    path = ANSDownloader(str(tmp_path)).download_quarter_files('2025', '1T', server.url)
+
+    assert path.read_bytes() == server.payload
+    assert server.gets() == []
+
+
+@pytest.mark.parametrize("base_url", [
+    "https://dadosabertos.ans.gov.br/FTP/PDA/",
+    "https://dadosabertos.ans.gov.br/FTP/PDA",
+    "https://dadosabertos.ans.gov.br/FTP/PDA/demonstracoes_contabeis",
+    "https://dadosabertos.ans.gov.br/FTP/PDA/demonstracoes_contabeis/",
+])
+def test_ans_url_accepts_legacy_base_url(monkeypatch, base_url):
+    monkeypatch.setattr(downloader.settings, "ANS_BASE_URL", base_url)
+
+    assert downloader.ans_url("demonstracoes_contabeis") == "https://dadosabertos.ans.gov.br/FTP/PDA/demonstracoes_contabeis"
+    assert downloader.ans_url("operadoras_de_plano_de_saude_ativas") == "https://dadosabertos.ans.gov.br/FTP/PDA/operadoras_de_plano_de_saude_ativas"
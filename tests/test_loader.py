@@ -0,0 +1,23 @@
+import re
+
+from src.etl.loader import SNAPSHOT_DDL, SNAPSHOT_REFRESH, VERSION_DDL, VERSION_REFRESH
+from src.models.operadora import Base
+
+
+def test_models_match_sql_ddl():
+    tables = []
+    for statement in SNAPSHOT_DDL + VERSION_DDL:
+        match = re.match(r"CREATE TABLE IF NOT EXISTS (\w+) \((.*)\)$", statement, re.S)
+        if not match:
+            continue
+        table, body = match.groups()
+        columns = {line.split()[0] for line in body.splitlines() if line.strip() and not line.strip().startswith("PRIMARY KEY")}
+        assert columns == set(Base.metadata.tables[table].columns.keys()), table
+        tables.append(table)
+
+    assert "data_version" in tables and len(tables) == 8
+
+
+def test_sql_sections_are_plain_statements():
+    for statement in SNAPSHOT_DDL + VERSION_DDL + SNAPSHOT_REFRESH + VERSION_REFRESH:
+        assert not statement.startswith("\\") and "--" not in statement
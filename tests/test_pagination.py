@@ -0,0 +1,30 @@
+import pytest
+from fastapi import HTTPException
+
+from src.api.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(["UNIMED SAÚDE", 42]), (str, int)) == ["UNIMED SAÚDE", 42]
+    assert decode_cursor("", (str, int)) is None
+
+
+@pytest.mark.parametrize("values", [
+    ["UNIMED", "42"],
+    [42, 42],
+    ["UNIMED", True],
+    ["UNIMED", 4.2],
+    ["UNIMED", None],
+    ["UNIMED"],
+    {"razao_social": "UNIMED", "id": 42},
+])
+def test_cursor_with_wrong_types_is_rejected(values):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(encode_cursor(values), (str, int))
+    assert error.value.status_code == 400
+
+
+def test_malformed_cursor_is_rejected():
+    with pytest.raises(HTTPException) as error:
+        decode_cursor("não é base64", (str, int))
+    assert error.value.status_code == 400
@@ -0,0 +1,80 @@
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import write_quarter
+from src.etl.downloader import ANSDownloader
+from src.etl.processor import ANSProcessor
+from src.etl.schema import to_centavos
+
+CHUNKSIZE = 2_000
+
+
+def _streaming_peak(tmp_path, csv_path) -> int:
+    processor = ANSProcessor(output_dir=str(tmp_path / "processed"), chunksize=CHUNKSIZE)
+
+    tracemalloc.start()
+    try:
+        for chunk in processor.read_file_chunks(csv_path):
+            assert len(chunk) <= CHUNKSIZE
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_read_file_chunks_peak_memory_independent_of_rows(tmp_path, quarter_csv):
+    small = _streaming_peak(tmp_path, quarter_csv(80_000, quarter=1))
+    large = _streaming_peak(tmp_path, quarter_csv(320_000, quarter=2))
+
+    # 4x mais linhas; o pico só depende do chunksize (e de quantos chunks o GC ainda não liberou)
+    assert large < small * 1.5
+
+
+def test_chunked_output_matches_single_read(tmp_path, quarter_csv):
+    csv_path = quarter_csv(30_000)
+    chunked = ANSProcessor(output_dir=str(tmp_path / "chunked"), chunksize=CHUNKSIZE)
+    single = ANSProcessor(output_dir=str(tmp_path / "single"), chunksize=1_000_000)
+
+    data_chunked = chunked.process_files(chunked.find_despesas_files([csv_path]))
+    data_single = single.process_files(single.find_despesas_files([csv_path]))
+
+    assert len(data_chunked) > 0
+    pd.testing.assert_frame_equal(
+        data_chunked.astype({'Descricao': str}),
+        data_single.astype({'Descricao': str})
+    )
+
+
+def test_comma_decimals_are_parsed(tmp_path, quarter_csv):
+    csv_path = quarter_csv(10_000)
+    raw = pd.read_csv(csv_path, sep=";", encoding="latin1", dtype=str)
+    assert raw["VL_SALDO_FINAL"].str.contains(",").all()
+
+    processor = ANSProcessor(output_dir=str(tmp_path / "processed"), chunksize=CHUNKSIZE)
+    assert processor.sniffer.sniff(csv_path)["decimal"] == ","
+    data = processor.process_files(processor.find_despesas_files([csv_path]))
+
+    eventos = raw[raw["DESCRICAO"].str.upper().str.contains("EVENTO|SINISTRO")]
+    expected = eventos["VL_SALDO_FINAL"].str.replace(",", "", regex=False).astype("int64")
+    assert len(data) == len(eventos)
+    assert data["ValorDespesas"].sum() == expected.sum()
+    assert (data["ValorDespesas"] != 0).all()
+
+
+def test_to_centavos_text_values():
+    values = pd.Series(["1234,56", "-0,5", "1.234.567,89", "12.5", None, "abc"], dtype=object)
+    assert to_centavos(values).tolist() == [123456, -50, 123456789, 1250, 0, 0]
+
+
+def test_synthetic_quarter_uses_decimal_comma(tmp_path):
+    path = tmp_path / "1T2025.zip"
+    write_quarter(path, 2025, 1, 5_000, np.arange(300000, 300050).astype(str), np.random.default_rng(3), 1_000, 1)
+    raw = pd.read_csv(path, sep=";", encoding="latin1", dtype=str)
+    assert raw["VL_SALDO_FINAL"].str.fullmatch(r"-?\d+,\d{2}").all()
+
+    processor = ANSProcessor(output_dir=str(tmp_path / "processed"), chunksize=CHUNKSIZE)
+    members = ANSDownloader(download_dir=str(tmp_path / "downloads")).list_zip_members(path)
+    data = processor.process_files(processor.find_despesas_files(members))
+    eventos = raw["DESCRICAO"].str.upper().str.contains("EVENTO|SINISTRO")
+    assert data["ValorDespesas"].sum() == raw.loc[eventos, "VL_SALDO_FINAL"].str.replace(",", "").astype("int64").sum()
@@ -0,0 +1,12 @@
+from src.api.search import NGramIndex
+
+
+def test_search_limit_keeps_most_relevant():
+    rows = [(1, "SAÚDE VIDA LTDA", "11111111000111"), (2, "PLANO SAUDE", "22222222000122"),
+            (3, "SAUDE", "33333333000133"), (4, "ODONTO SUL", "44444444000144")]
+    index = NGramIndex(rows)
+
+    ranked = index.search("saude")
+    assert ranked == [3, 2, 1]
+    assert index.search("saude", 2) == ranked[:2]
+    assert index.search("333", 1) == [3]